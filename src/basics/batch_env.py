@@ -0,0 +1,237 @@
+import multiprocessing as mp
+from typing import Callable, Optional
+
+import numpy as np
+
+from basics.load import build_game, load_level
+from interface.ai import NO_ACTION, apply_action
+from interface.control import Controller, RandomController
+from logic.game import Game, Player
+from logic.towers import TOWER_TYPES, LongRangeTower, MiningTower, ShortRangeTower
+
+# tower type id in observations, 0 is an empty spot
+TYPE_IDS = {tower_type: i + 1 for i, tower_type in enumerate(TOWER_TYPES.values())}
+
+ENV_TOWER_TYPES = [MiningTower, LongRangeTower, ShortRangeTower]
+START_MONEY = 100
+
+
+def random_opponent(game: Game, player: Player, seed: int) -> Controller:
+    return RandomController(game, player, seed=seed, press_chance=0.3)
+
+
+class BatchEnv:
+    # N independent games of one level stepped together.
+    # Action of a game for the learning player:
+    #   0 - nothing,
+    #   1 + spot * K + k - build tower type k at spot (K tower types),
+    #   1 + spots * K + spot - focus all towers on the enemy tower at spot.
+    # A game that ends is reset at once, the returned observation is of the new game.
+    def __init__(self, level_file: str, n: int, player_id: int = 1, frame_skip: int = 1,
+                 max_ticks: int = 60 * 60 * 5, opponent: Optional[Callable[[Game, Player, int], Controller]] = None,
+                 seed: int = 0):
+        level = load_level(level_file)
+        self.n = n
+        self.player_id = player_id
+        self.frame_skip = frame_skip
+        self.max_ticks = max_ticks
+
+        self.games: list[Game] = []
+        self.opponents: list[Optional[Controller]] = []
+        for i in range(n):
+            game = build_game(level)
+            for p in game.players:
+                p.set_tower_types(list(ENV_TOWER_TYPES))
+                p.money += START_MONEY
+            self.games.append(game)
+            self.opponents.append(
+                opponent(game, game.opponent(game.players[player_id - 1]), seed + i) if opponent else None
+            )
+        self.initial = [game.snapshot() for game in self.games]
+
+        self.num_spots = len(self.games[0].spots)
+        self.num_types = len(ENV_TOWER_TYPES)
+        self.num_actions = 1 + self.num_spots * self.num_types + self.num_spots
+
+        s = self.num_spots
+        # observation buffers are reused, copy them to keep
+        self.obs = {
+            'owner': np.zeros((n, s), dtype=np.int8),
+            'tower_type': np.zeros((n, s), dtype=np.int8),
+            'hp': np.zeros((n, s), dtype=np.float32),
+            'attack_cd': np.zeros((n, s), dtype=np.int32),
+            'ban_time': np.zeros((n, s), dtype=np.int32),
+            'banned_player': np.zeros((n, s), dtype=np.int8),
+            'money': np.zeros((n, 2), dtype=np.int64),
+            'building_cds': np.zeros((n, 2, self.num_types), dtype=np.int32),
+        }
+        self.rewards = np.zeros(n, dtype=np.float32)
+        self.dones = np.zeros(n, dtype=bool)
+
+        # spots with a running ban and towers alive after the last step, per game
+        self.banned: list[set[int]] = [set() for _ in range(n)]
+        self.alive: list[dict] = [dict(game.towers) for game in self.games]
+
+    def reset(self) -> dict:
+        for i in range(self.n):
+            self.reset_game(i)
+        self.observe()
+        return self.obs
+
+    def reset_game(self, i: int):
+        game = self.games[i]
+        game.restore(self.initial[i])
+        self.banned[i].clear()
+        self.alive[i] = dict(game.towers)
+
+    def decode(self, action: int) -> tuple:
+        if action <= 0 or action >= self.num_actions:
+            return NO_ACTION
+        action -= 1
+        builds = self.num_spots * self.num_types
+        if action < builds:
+            return 'build', action // self.num_types, action % self.num_types
+        spot = action - builds
+        return 'focus', spot
+
+    def step(self, actions) -> tuple[dict, np.ndarray, np.ndarray]:
+        rewards = self.rewards
+        dones = self.dones
+        rewards[:] = 0
+        dones[:] = False
+        for i, game in enumerate(self.games):
+            player = game.players[self.player_id - 1]
+            action = self.decode(int(actions[i]))
+            if action[0] == 'focus':
+                tower = game.spots[action[1]].tower
+                if tower is None or tower.player is player:
+                    action = NO_ACTION
+            apply_action(game, player, action)
+
+            opponent = self.opponents[i]
+            for _ in range(self.frame_skip):
+                if opponent is not None:
+                    opponent.handle([])
+                game.update()
+                if game.winner is not None:
+                    break
+
+            if game.winner is not None or game.time >= self.max_ticks:
+                if game.winner is not None:
+                    rewards[i] = 1.0 if game.winner is player else -1.0
+                dones[i] = True
+                self.reset_game(i)
+        self.observe()
+        return self.obs, rewards, dones
+
+    def observe(self):
+        obs = self.obs
+        for key in ('owner', 'tower_type', 'hp', 'attack_cd'):
+            obs[key].fill(0)
+        money = obs['money']
+        cds = obs['building_cds']
+        for i, game in enumerate(self.games):
+            self.observe_towers(i, game)
+            self.observe_bans(i, game)
+            for p in game.players:
+                money[i, p.id - 1] = p.money
+                cds[i, p.id - 1] = [p.building_cds[t] for t in p.tower_types]
+
+    def observe_towers(self, i: int, game: Game):
+        towers = game.towers
+        # towers that died since the last step leave bans on their spots
+        for uid, tower in self.alive[i].items():
+            if uid not in towers:
+                self.banned[i].add(tower.spot.index)
+        self.alive[i] = dict(towers)
+        if not towers:
+            return
+
+        obs = self.obs
+        rows = [
+            (t.spot.index, t.player.id, TYPE_IDS[type(t)], t.hp / t.stats.max_hp, t.attack_cd)
+            for t in towers.values()
+        ]
+        index, owner, type_id, hp, attack_cd = zip(*rows)
+        index = list(index)
+        obs['owner'][i, index] = owner
+        obs['tower_type'][i, index] = type_id
+        obs['hp'][i, index] = hp
+        obs['attack_cd'][i, index] = attack_cd
+
+    def observe_bans(self, i: int, game: Game):
+        ban_time = self.obs['ban_time'][i]
+        banned_player = self.obs['banned_player'][i]
+        banned = self.banned[i]
+        if not banned and not banned_player.any():
+            return
+        ban_time.fill(0)
+        banned_player.fill(0)
+        for index in list(banned):
+            spot = game.spots[index]
+            if spot.banned_player is None:
+                banned.discard(index)
+            else:
+                ban_time[index] = spot.ban_time
+                banned_player[index] = spot.banned_player.id
+
+    def close(self):
+        pass
+
+
+def _shard_worker(conn, args: tuple, kwargs: dict):
+    env = BatchEnv(*args, **kwargs)
+    while True:
+        command, data = conn.recv()
+        if command == 'step':
+            conn.send(env.step(data))
+        elif command == 'reset':
+            conn.send(env.reset())
+        else:
+            conn.close()
+            return
+
+
+class ShardedBatchEnv:
+    # BatchEnv split over processes, same interface; opponent must be picklable
+    def __init__(self, level_file: str, n: int, shards: int, seed: int = 0, **kwargs):
+        sizes = [n // shards + (i < n % shards) for i in range(shards)]
+        self.n = n
+        spots = len(load_level(level_file).pos)
+        self.num_actions = 1 + spots * len(ENV_TOWER_TYPES) + spots
+        self.bounds = np.cumsum([0] + sizes)
+        self.conns = []
+        self.processes = []
+        for i, size in enumerate(sizes):
+            parent, child = mp.Pipe()
+            process = mp.Process(
+                target=_shard_worker,
+                args=(child, (level_file, size), dict(kwargs, seed=seed + int(self.bounds[i]))),
+                daemon=True,
+            )
+            process.start()
+            self.conns.append(parent)
+            self.processes.append(process)
+
+    def reset(self) -> dict:
+        for conn in self.conns:
+            conn.send(('reset', None))
+        return self._concat([conn.recv() for conn in self.conns])
+
+    def step(self, actions) -> tuple[dict, np.ndarray, np.ndarray]:
+        actions = np.asarray(actions)
+        for conn, start, end in zip(self.conns, self.bounds[:-1], self.bounds[1:]):
+            conn.send(('step', actions[start:end]))
+        results = [conn.recv() for conn in self.conns]
+        obs = self._concat([r[0] for r in results])
+        return obs, np.concatenate([r[1] for r in results]), np.concatenate([r[2] for r in results])
+
+    @staticmethod
+    def _concat(parts: list[dict]) -> dict:
+        return {key: np.concatenate([p[key] for p in parts]) for key in parts[0]}
+
+    def close(self):
+        for conn in self.conns:
+            conn.send(('close', None))
+        for process in self.processes:
+            process.join()
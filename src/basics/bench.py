@@ -0,0 +1,234 @@
+import json
+import os
+import platform
+import random
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+
+from basics.generate import generate_level
+from basics.load import build_game, load_from_file, load_level, write_level
+from logic.game import Game, Player
+from logic.towers import LongRangeTower, MiningTower, ShortRangeTower
+
+SHIPPED_LEVELS = ['levels/grid.lvl', 'levels/asym.lvl']
+SYNTHETIC_SIZES = [100, 1000, 10000]
+DENSITIES = [0.1, 0.5, 0.9]
+TOWER_TYPES = [MiningTower, LongRangeTower, ShortRangeTower]
+
+SPACING = 100
+
+
+def write_grid_level(n_spots: int, filename: str):
+    # square-ish grid with edges to the right and down neighbours, bases in the middle of the sides
+    write_level(generate_level(n_spots, 'grid', spacing=SPACING), filename)
+
+
+def populate(game: Game, density: float, seed: int = 0):
+    # random towers of random owners on a `density` share of the empty spots,
+    # so the whole board is a front line
+    rng = random.Random(seed)
+    for player in game.players:
+        player.set_tower_types(TOWER_TYPES)
+    for s in game.spots:
+        if s.tower is None and rng.random() < density:
+            s.create_tower(rng.choice(TOWER_TYPES), rng.choice(game.players))
+
+
+def measure(fn, min_time: float = 0.3, min_calls: int = 3, setup=None) -> dict:
+    times = []
+    deadline = time.perf_counter() + min_time
+    while len(times) < min_calls or time.perf_counter() < deadline:
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return {
+        'calls': len(times),
+        'min_s': min(times),
+        'mean_s': sum(times) / len(times),
+    }
+
+
+def bench_level(level: str, density: float, with_draw: bool) -> list[dict]:
+    results = []
+
+    def add(name, stats):
+        stats.update(name=name, level=os.path.basename(level), density=density)
+        results.append(stats)
+
+    add('load_from_file', measure(lambda: load_from_file(level)))
+
+    game = load_from_file(level)
+    populate(game, density)
+    stats = {'spots': len(game.spots), 'towers': len(game.towers)}
+
+    # let the fight start so there are targets and projectiles
+    for _ in range(120):
+        game.update()
+    stats['projectiles'] = len(game.projectiles)
+
+    add('Game.update', measure(game.update) | stats)
+
+    towers = list(game.towers.values())
+    # the damage repetitions start from the same hp, and the rows after them from the board before
+    before_targeting = game.snapshot()
+
+    def retarget_all():
+        for tower in towers:
+            tower.target = None
+            tower.update_target()
+    add('Tower.update_target', measure(retarget_all) | stats)
+
+    # late game: every tower is hit, then every tower chooses again
+    def damage_and_retarget_all():
+        for tower in towers:
+            if tower.hp > 1:
+                tower.take_damage(1)
+        retarget_all()
+    add('damage + update_target',
+        measure(damage_and_retarget_all, setup=lambda: game.restore(before_targeting)) | stats)
+
+    # the same with candidate heaps, built before the timing as they are in a running game
+    def restore_with_heaps():
+        game.restore(before_targeting)
+        for tower in towers:
+            if tower.ATTACK_RANGE is not None:
+                tower.build_candidates()
+    game.target_index = True
+    add('update_target (index)', measure(retarget_all) | stats)
+    add('damage + update_target (index)', measure(damage_and_retarget_all, setup=restore_with_heaps) | stats)
+    game.target_index = False
+    game.restore(before_targeting)
+
+    # every repetition starts from the same board, towers killed by the last one included
+    store = game.projectiles
+    before_projectiles = game.snapshot()
+    add('ProjectileStore.update', measure(store.update, setup=lambda: game.restore(before_projectiles)) | stats)
+
+    add('Game.income_frame', measure(game.income_frame) | stats)
+
+    snap = game.snapshot()
+    add('Game.snapshot', measure(game.snapshot) | stats)
+    add('Game.restore', measure(lambda: game.restore(snap)) | stats)
+
+    if with_draw:
+        add('Drawer.draw_frame', measure(make_drawer(game).draw_frame) | stats)
+
+    return results
+
+
+def make_drawer(game: Game):
+    # offscreen surface, works with the dummy video driver
+    import pygame as pg
+    from interface.control import Controller
+    from interface.draw import Drawer
+
+    pg.font.init()
+    screen = pg.Surface((1000, 800))
+    controllers = (Controller(game, game.player_one), Controller(game, game.player_two))
+    return Drawer(screen, game, controllers)
+
+
+def run_suite(sizes=SYNTHETIC_SIZES, densities=DENSITIES, with_draw=True) -> dict:
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        levels = list(SHIPPED_LEVELS)
+        for n in sizes:
+            filename = os.path.join(tmp, f"synthetic_{n}.lvl")
+            write_grid_level(n, filename)
+            levels.append(filename)
+        for level in levels:
+            for density in densities:
+                results += bench_level(level, density, with_draw)
+    return {
+        'meta': {
+            'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'machine': platform.machine(),
+        },
+        'results': results,
+    }
+
+
+def result_key(r: dict) -> tuple:
+    return r['name'], r['level'], r['density']
+
+
+def compare(old: dict, new: dict, threshold: float = 0.1) -> list[dict]:
+    # compares best times, a ratio above 1 + threshold is a regression
+    old_by_key = {result_key(r): r for r in old['results']}
+    rows = []
+    for r in new['results']:
+        prev = old_by_key.get(result_key(r))
+        if prev is None or prev['min_s'] == 0:
+            continue
+        ratio = r['min_s'] / prev['min_s']
+        rows.append({
+            'name': r['name'], 'level': r['level'], 'density': r['density'],
+            'old_s': prev['min_s'], 'new_s': r['min_s'], 'ratio': ratio,
+            'regression': ratio > 1 + threshold,
+        })
+    return rows
+
+
+def save(report: dict, filename: str):
+    with open(filename, 'w') as f:
+        json.dump(report, f, indent=1)
+
+
+def load(filename: str) -> dict:
+    with open(filename) as f:
+        return json.load(f)
+
+
+def append_history(report: dict, filename: str):
+    with open(filename, 'a') as f:
+        f.write(json.dumps(report) + '\n')
+
+
+def allocated(fn):
+    # (bytes still allocated by fn when it returns, its result)
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        result = fn()
+        return tracemalloc.get_traced_memory()[0] - before, result
+    finally:
+        tracemalloc.stop()
+
+
+def memory_report(n_spots: int = 10000, n_projectiles: int = 50000, density: float = 0.5) -> dict:
+    # bytes per entity, fields owned by the entity included
+    with tempfile.TemporaryDirectory() as tmp:
+        filename = os.path.join(tmp, f'grid_{n_spots}.lvl')
+        write_grid_level(n_spots, filename)
+        level = load_level(filename)
+    # the whole game built from the level, range tables included
+    spot_bytes, game = allocated(lambda: build_game(level))
+    n_towers_before = len(game.towers)
+    tower_bytes, _ = allocated(lambda: populate(game, density))
+    n_towers = len(game.towers) - n_towers_before
+    player_bytes, players = allocated(lambda: [Player(game, 1) for _ in range(n_spots)])
+
+    towers = list(game.towers.values())
+    store = game.projectiles
+
+    def fire():
+        for i in range(n_projectiles):
+            store.add(towers[i % len(towers)], towers[(i + 1) % len(towers)], 100, 4.0)
+    projectile_bytes, _ = allocated(fire)
+    return {
+        'spots': n_spots,
+        'towers': n_towers,
+        'projectiles': n_projectiles,
+        'bytes_per_spot': round(spot_bytes / n_spots),
+        'bytes_per_tower': round(tower_bytes / n_towers),
+        'bytes_per_player': round(player_bytes / len(players)),
+        'bytes_per_projectile': round(projectile_bytes / n_projectiles),
+        'bytes_per_projectile_row': sum(c.itemsize * (c.size // len(c)) for c in store.columns()),
+    }
@@ -0,0 +1,164 @@
+import os
+import queue
+import subprocess
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+
+import pygame as pg
+
+from basics.headless import HeadlessSession
+from interface.control import Controller
+from interface.draw import Drawer
+from logic.game import Game
+
+SCREEN_SIZE = (1000, 800)
+
+
+def frame_size(scale: float) -> tuple[int, int]:
+    return max(1, round(SCREEN_SIZE[0] * scale)), max(1, round(SCREEN_SIZE[1] * scale))
+
+
+def encoder_command(out: str, size: tuple[int, int], fps: float) -> list[str]:
+    # ffmpeg reading raw rgb24 frames from stdin
+    return [
+        'ffmpeg', '-y', '-loglevel', 'error',
+        '-f', 'rawvideo', '-pix_fmt', 'rgb24', '-s', f'{size[0]}x{size[1]}', '-r', f'{fps:g}', '-i', '-',
+        '-pix_fmt', 'yuv420p', out,
+    ]
+
+
+def save_png(data: bytes, size: tuple[int, int], path: str):
+    pg.image.save(pg.image.frombuffer(data, size, 'RGB'), path)
+
+
+class FrameWriter:
+    # Takes raw RGB frames and encodes them on a background thread.
+    # The queue is bounded, a full queue blocks the caller and counts as a stall.
+    def __init__(self, size: tuple[int, int], max_pending: int = 64):
+        self.size = size
+        self.queue: queue.Queue = queue.Queue(max_pending)
+        self.written = 0
+        self.stalls = 0
+        self.error: Optional[BaseException] = None
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def write(self, data: bytes):
+        if self.error is not None:
+            raise self.error
+        try:
+            self.queue.put_nowait(data)
+        except queue.Full:
+            self.stalls += 1
+            self.queue.put(data)
+
+    def close(self):
+        self.queue.put(None)
+        self.thread.join()
+        if self.error is None:
+            self.finish()
+        if self.error is not None:
+            raise self.error
+
+    def _run(self):
+        while (data := self.queue.get()) is not None:
+            if self.error is not None:
+                continue
+            try:
+                self.encode(data)
+                self.written += 1
+            except BaseException as e:
+                self.error = e
+
+    def encode(self, data: bytes):
+        raise NotImplementedError
+
+    def finish(self):
+        pass
+
+
+class PngWriter(FrameWriter):
+    # frame_000000.png, ... in a directory, encoded on the writer thread or in worker processes
+    def __init__(self, directory: str, size: tuple[int, int], workers: int = 0, max_pending: int = 64):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.index = 0
+        self.workers = workers
+        self.pool: Optional[ProcessPoolExecutor] = ProcessPoolExecutor(workers) if workers > 0 else None
+        self.pending = deque()
+        super().__init__(size, max_pending)
+
+    def encode(self, data: bytes):
+        path = os.path.join(self.directory, f'frame_{self.index:06d}.png')
+        self.index += 1
+        if self.pool is None:
+            save_png(data, self.size, path)
+            return
+        self.pending.append(self.pool.submit(save_png, data, self.size, path))
+        # keep every worker busy without piling up frames
+        while len(self.pending) > 2 * self.workers:
+            self.pending.popleft().result()
+
+    def finish(self):
+        if self.pool is not None:
+            while self.pending:
+                self.pending.popleft().result()
+            self.pool.shutdown()
+
+
+class PipeWriter(FrameWriter):
+    # raw rgb24 frames into the stdin of an encoder process
+    def __init__(self, command: list[str], size: tuple[int, int], max_pending: int = 64):
+        self.command = command
+        self.process = subprocess.Popen(command, stdin=subprocess.PIPE)
+        super().__init__(size, max_pending)
+
+    def encode(self, data: bytes):
+        self.process.stdin.write(data)
+
+    def finish(self):
+        self.process.stdin.close()
+        code = self.process.wait()
+        if code != 0:
+            raise RuntimeError(f"Encoder exited with code {code}: {' '.join(self.command)}")
+
+
+class CaptureSession(HeadlessSession):
+    # Plays without a window and draws every stride-th tick into an offscreen surface,
+    # frames go to the writer scaled to its size
+    def __init__(self, game: Game, controllers: tuple[Controller, Controller], writer: FrameWriter,
+                 stride: int = 1, start: int = 0):
+        super().__init__(game, controllers)
+        pg.init()
+        pg.font.init()
+        self.surface = pg.Surface(SCREEN_SIZE)
+        self.drawer = Drawer(self.surface, game, controllers)
+        self.writer = writer
+        self.stride = stride
+        self.start = start
+        self.scaled: Optional[pg.Surface] = pg.Surface(writer.size) if writer.size != SCREEN_SIZE else None
+        self.frames = 0
+
+    def frame(self):
+        super().frame()
+        if self.game.time >= self.start and (self.game.time - self.start) % self.stride == 0:
+            self.capture()
+
+    def capture(self):
+        self.drawer.draw_frame()
+        frame = self.surface
+        if self.scaled is not None:
+            frame = pg.transform.smoothscale(self.surface, self.scaled.get_size(), self.scaled)
+        self.writer.write(pg.image.tobytes(frame, 'RGB'))
+        self.frames += 1
+
+    def run(self, ticks: int) -> float:
+        # returns captured frames per second, waiting for the writer to finish
+        start = time.perf_counter()
+        super().run(ticks)
+        self.writer.close()
+        elapsed = time.perf_counter() - start
+        return self.frames / elapsed if elapsed > 0 else float('inf')
@@ -0,0 +1,174 @@
+import math
+from collections import deque
+
+import numpy as np
+
+from basics.load import Level, graph_csr
+from logic.ranges import compute_ranges, pairs_within
+
+TOPOLOGIES = ['grid', 'geometric']
+SYMMETRIES = ['none', 'mirror', 'rotate']
+
+# (axis, sign) of the pointer moves L/R/U/D, y grows down
+MOVE_DIRECTIONS = [(0, -1), (0, 1), (1, -1), (1, 1)]
+
+
+def grid_positions(rows: int, cols: int, spacing: float) -> np.ndarray:
+    # row by row, the first spot at (spacing, spacing)
+    r, c = np.divmod(np.arange(rows * cols), cols)
+    return np.stack([spacing * (c + 1), spacing * (r + 1)], axis=1).astype(np.float64)
+
+
+def geometric_positions(rows: int, cols: int, spacing: float, rng: np.random.Generator,
+                        fill: float = 0.8, jitter: float = 0.3) -> np.ndarray:
+    # grid points moved by up to jitter * spacing, a fill share of them kept:
+    # random, but never closer than (1 - 2 * jitter) * spacing
+    pos = grid_positions(rows, cols, spacing)
+    pos += rng.uniform(-jitter * spacing, jitter * spacing, pos.shape)
+    return pos[rng.random(len(pos)) < fill]
+
+
+def symmetrize(pos: np.ndarray, width: float, height: float, symmetry: str,
+               gap: float) -> tuple[np.ndarray, np.ndarray]:
+    # the left half of the spots and its mirror or 180 degree rotated copy, returns the positions and
+    # for every spot the index of its image. Spots right on the axis are kept once, the ones closer to
+    # it than gap / 2 are dropped so that no spot comes too close to its image.
+    if symmetry == 'none':
+        return pos, np.arange(len(pos))
+    middle = width / 2
+    x = pos[:, 0]
+    half = pos[x < middle - gap / 2]
+    axis = pos[x == middle]
+    image = half.copy()
+    image[:, 0] = width - image[:, 0]
+    axis_image = axis.copy()
+    if symmetry == 'rotate':
+        image[:, 1] = height - image[:, 1]
+        axis_image[:, 1] = height - axis_image[:, 1]
+    k, a = len(half), len(axis)
+    axis_mirror = 2 * k + np.array([nearest(axis, p) for p in axis_image], dtype=np.int64)
+    mirror = np.concatenate([np.arange(k, 2 * k), np.arange(k), axis_mirror.reshape(a)])
+    return np.concatenate([half, image, axis]), mirror
+
+
+def link(pos: np.ndarray, radius: float) -> np.ndarray:
+    # (edges, 2) pairs of spots closer than radius, lower index first
+    ptr, idx, _ = compute_ranges(pos, radius)
+    src = np.repeat(np.arange(len(pos)), np.diff(ptr))
+    keep = src < idx
+    return np.stack([src[keep], idx[keep]], axis=1).astype(np.int64).reshape(-1, 2)
+
+
+def largest_component(n: int, edges: np.ndarray) -> np.ndarray:
+    # mask of the spots in the biggest connected part of the graph
+    ptr, adj = graph_csr(n, edges)
+    ptr, adj = ptr.tolist(), adj.tolist()
+    label = [-1] * n
+    sizes = []
+    for start in range(n):
+        if label[start] >= 0:
+            continue
+        comp = len(sizes)
+        label[start] = comp
+        queue = deque([start])
+        size = 0
+        while queue:
+            i = queue.popleft()
+            size += 1
+            for j in adj[ptr[i]:ptr[i + 1]]:
+                if label[j] < 0:
+                    label[j] = comp
+                    queue.append(j)
+        sizes.append(size)
+    if not sizes:
+        return np.zeros(0, dtype=bool)
+    return np.array(label) == int(np.argmax(sizes))
+
+
+def compute_moves(pos: np.ndarray, reach: float, limit: float) -> np.ndarray:
+    # (spots, 4) pointer moves: for every direction the spot within 45 degrees of it with the least
+    # along + 2 * aside, or the spot itself if there is none closer than limit. Searched in grid cells
+    # of size reach, then twice that for the spots whose best may still be farther away.
+    n = len(pos)
+    moves = np.repeat(np.arange(n, dtype=np.int32)[:, None], 4, axis=1)
+    todo = np.ones((n, 4), dtype=bool) if n > 1 else np.zeros((n, 4), dtype=bool)
+    radius = reach
+    while todo.any():
+        final = radius >= limit
+        src, dst, _ = pairs_within(pos, radius, np.flatnonzero(todo.any(axis=1)))
+        delta = pos[dst] - pos[src]
+        for d, (axis, sign) in enumerate(MOVE_DIRECTIONS):
+            along = sign * delta[:, axis]
+            aside = np.abs(delta[:, 1 - axis])
+            ok = todo[src, d] & (along > 0) & (aside <= along)
+            s, t, cost = src[ok], dst[ok], (along + 2 * aside)[ok]
+            if not len(s):
+                continue
+            order = np.lexsort((t, cost, s))
+            s, t, cost = s[order], t[order], cost[order]
+            first = np.flatnonzero(np.r_[True, s[1:] != s[:-1]])
+            s, t, cost = s[first], t[first], cost[first]
+            # anything outside the circle costs more than radius / sqrt(2)
+            sure = cost <= radius / math.sqrt(2) if not final else np.ones(len(s), dtype=bool)
+            moves[s[sure], d] = t[sure]
+            todo[s[sure], d] = False
+        if final:
+            break
+        radius = min(2 * radius, limit)
+    return moves
+
+
+def nearest(pos: np.ndarray, point: tuple[float, float]) -> int:
+    delta = pos - point
+    return int(np.argmin((delta * delta).sum(axis=1)))
+
+
+def generate_level(n: int, topology: str = 'grid', symmetry: str = 'none', spacing: float = 100,
+                   seed: int = 0, diagonals: bool = False) -> Level:
+    # About n spots on a square-ish board, players start at the middle of the left and right sides
+    if topology not in TOPOLOGIES:
+        raise ValueError(f"Unknown topology: {topology}")
+    if symmetry not in SYMMETRIES:
+        raise ValueError(f"Unknown symmetry: {symmetry}")
+    rng = np.random.default_rng(seed)
+    cols = max(2, math.ceil(math.sqrt(n)))
+    rows = max(1, math.ceil(n / cols))
+    if topology == 'grid':
+        pos = grid_positions(rows, cols, spacing)
+        # lattice neighbours, diagonal ones too if asked
+        radius = spacing * (1.5 if diagonals else 1.01)
+        gap = 0.0
+    else:
+        fill, jitter = 0.8, 0.3
+        cols = max(2, math.ceil(cols / math.sqrt(fill)))
+        rows = max(1, math.ceil(n / fill / cols))
+        pos = geometric_positions(rows, cols, spacing, rng, fill, jitter)
+        radius = spacing * 1.6
+        gap = (1 - 2 * jitter) * spacing
+    width, height = spacing * (cols + 1), spacing * (rows + 1)
+    pos, mirror = symmetrize(pos, width, height, symmetry, gap)
+
+    edges = link(pos, radius)
+    keep = largest_component(len(pos), edges)
+    if not keep.all():
+        index = np.cumsum(keep) - 1
+        pos, edges = pos[keep], index[edges[keep[edges[:, 0]] & keep[edges[:, 1]]]]
+        # a spot whose image was dropped loses the symmetry, its own index is kept
+        mirror = np.where(keep[mirror], index[mirror], -1)[keep]
+        mirror = np.where(mirror >= 0, mirror, np.arange(len(pos)))
+    if len(pos) < 2:
+        raise ValueError("Level too small")
+
+    base_one = nearest(pos, (0.0, height / 2))
+    base_two = int(mirror[base_one]) if symmetry != 'none' else nearest(pos, (width, height / 2))
+    if base_two == base_one:
+        base_two = nearest(pos, (width, height / 2))
+    if topology == 'grid' and symmetry == 'none':
+        # middle row, the same start spots as the benchmark grids always had
+        base_one, base_two = (rows // 2) * cols, (rows // 2) * cols + cols - 1
+
+    adj_ptr, adj = graph_csr(len(pos), edges)
+    moves = compute_moves(pos, 2 * spacing, 8 * spacing)
+    level = Level(pos, adj_ptr, adj, moves, np.array([base_one, base_two], dtype=np.int32))
+    level.validate()
+    return level
@@ -0,0 +1,29 @@
+import time
+
+from logic.game import Game
+from interface.control import Controller
+
+
+class HeadlessSession:
+    def __init__(self, game: Game, controllers: tuple[Controller, Controller]):
+        self.game = game
+        self.controller_one, self.controller_two = controllers
+
+    def frame(self):
+        self.controller_one.handle([])
+        self.controller_two.handle([])
+        self.game.update()
+        if self.game.profiler is not None:
+            self.game.profiler.end_tick(self.game.time)
+
+    def run(self, ticks: int) -> float:
+        # returns simulated ticks per second
+        start = time.perf_counter()
+        for _ in range(ticks):
+            self.frame()
+        elapsed = time.perf_counter() - start
+        return ticks / elapsed if elapsed > 0 else float('inf')
+
+    def set_tower_types(self, tower_types):
+        self.game.player_one.set_tower_types(tower_types)
+        self.game.player_two.set_tower_types(tower_types)
@@ -0,0 +1,91 @@
+import mmap
+import struct
+
+import numpy as np
+
+from basics.load import Level, parse_level
+
+# File layout (little endian):
+#   header    magic, version, number of sections
+#   sections  name, dtype, shape (rows, cols; cols = 0 for 1D), offset in file - each
+#   data      arrays, 8 byte aligned
+MAGIC = b'TOLV'
+VERSION = 1
+HEADER = struct.Struct('<4sHH')
+SECTION = struct.Struct('<16s4sQQQ')
+ALIGN = 8
+
+
+def is_compiled(filename) -> bool:
+    with open(filename, 'rb') as f:
+        return f.read(len(MAGIC)) == MAGIC
+
+
+def level_sections(level: Level) -> dict[str, np.ndarray]:
+    sections = {
+        'pos': level.pos.astype('<f8'),
+        'adj_ptr': level.adj_ptr.astype('<i8'),
+        'adj': level.adj.astype('<i4'),
+        'moves': level.moves.astype('<i4'),
+        'bases': level.bases.astype('<i4'),
+        'radii': np.array(sorted(level.ranges), dtype='<f8'),
+    }
+    for k, radius in enumerate(sorted(level.ranges)):
+        ptr, idx, dist_sq = level.ranges[radius]
+        sections[f'range{k}_ptr'] = ptr.astype('<i8')
+        sections[f'range{k}_idx'] = idx.astype('<i4')
+        sections[f'range{k}_dist'] = dist_sq.astype('<f8')
+    return sections
+
+
+def write_compiled(level: Level, filename):
+    sections = level_sections(level)
+    offset = HEADER.size + SECTION.size * len(sections)
+    table, blobs = [], []
+    for name, arr in sections.items():
+        offset += -offset % ALIGN
+        rows = arr.shape[0]
+        cols = arr.shape[1] if arr.ndim == 2 else 0
+        table.append(SECTION.pack(name.encode(), arr.dtype.str.encode(), rows, cols, offset))
+        blobs.append((offset, arr.tobytes()))
+        offset += arr.nbytes
+
+    with open(filename, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, VERSION, len(sections)))
+        f.write(b''.join(table))
+        for offset, blob in blobs:
+            f.write(b'\0' * (offset - f.tell()))
+            f.write(blob)
+
+
+def read_compiled(filename) -> Level:
+    with open(filename, 'rb') as f:
+        buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    magic, version, count = HEADER.unpack_from(buf, 0)
+    if magic != MAGIC:
+        raise ValueError(f"Not a compiled level: {filename}")
+    if version != VERSION:
+        raise ValueError(f"Unsupported compiled level version {version}, recompile {filename}")
+
+    sections = {}
+    for k in range(count):
+        name, dtype, rows, cols, offset = SECTION.unpack_from(buf, HEADER.size + k * SECTION.size)
+        dtype = np.dtype(dtype.rstrip(b'\0').decode())
+        shape = (rows, cols) if cols else (rows,)
+        arr = np.frombuffer(buf, dtype=dtype, count=rows * max(cols, 1), offset=offset)
+        sections[name.rstrip(b'\0').decode()] = arr.reshape(shape)
+
+    ranges = {
+        float(radius): (sections[f'range{k}_ptr'], sections[f'range{k}_idx'], sections[f'range{k}_dist'])
+        for k, radius in enumerate(sections['radii'].tolist())
+    }
+    return Level(sections['pos'], sections['adj_ptr'], sections['adj'], sections['moves'], sections['bases'], ranges)
+
+
+def compile_level(src, dst):
+    level = parse_level(src)
+    level.validate()
+    level.add_standard_ranges()
+    write_compiled(level, dst)
+    return level
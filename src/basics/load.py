@@ -1,45 +1,164 @@
+import os
+
+import numpy as np
 import pygame as pg
 
-from logic.game import Game, Spot
+from logic.game import ControllerMoves, Game, Spot
 from logic.towers import BaseTower
+from logic.projectiles import ScheduledProjectileStore
+from logic.ranges import RangeTable, compute_ranges
+from logic import consts
+
+
+class Level:
+    # Everything a level file describes, as arrays:
+    #   pos      (n, 2) spot coordinates
+    #   adj_ptr  (n + 1) and adj - spot graph in CSR form, adj[adj_ptr[i]:adj_ptr[i + 1]] are neighbours of i
+    #   moves    (n, 4) pointer moves L/R/U/D
+    #   bases    (2) start spots of the players
+    #   ranges   radius -> (ptr, idx, dist_sq) range tables, see logic.ranges
+    def __init__(self, pos, adj_ptr, adj, moves, bases, ranges=None):
+        self.pos = pos
+        self.adj_ptr = adj_ptr
+        self.adj = adj
+        self.moves = moves
+        self.bases = bases
+        self.ranges: dict[float, tuple] = ranges if ranges is not None else {}
+
+    def validate(self):
+        n = len(self.pos)
+        if n == 0:
+            raise ValueError("Level has no spots")
+        if self.pos.shape != (n, 2) or not np.isfinite(self.pos).all():
+            raise ValueError("Bad spot coordinates")
+        if len(self.adj_ptr) != n + 1 or self.adj_ptr[0] != 0 or self.adj_ptr[-1] != len(self.adj) \
+                or (np.diff(self.adj_ptr) < 0).any():
+            raise ValueError("Bad spot graph")
+        for name, arr in [('graph', self.adj), ('move map', self.moves), ('start towers', self.bases)]:
+            if len(arr) > 0 and (arr.min() < 0 or arr.max() >= n):
+                raise ValueError(f"Spot index out of range in {name}")
+        if self.moves.shape != (n, 4):
+            raise ValueError("Move map needs 4 moves for every spot")
+        if len(self.bases) != 2 or self.bases[0] == self.bases[1]:
+            raise ValueError("Level needs two different start towers")
 
+    def add_standard_ranges(self):
+        for radius in (consts.RANGE_SHORT, consts.RANGE_LONG):
+            if radius not in self.ranges:
+                self.ranges[radius] = compute_ranges(self.pos, radius)
 
-def load_from_file(filename):
-    game = Game()
+
+def parse_level(filename) -> Level:
     with open(filename) as f:
         def read():
             while True:
                 line = f.readline()
-                if line[0] != "#":
+                if line == "":
+                    raise ValueError(f"Unexpected end of level file {filename}")
+                if line[0] != "#" and line.strip():
                     return line
 
         # Number of points
         n = int(read())
 
         # Spots positions
-        for _ in range(n):
-            spot = Spot(game)
-            spot.pos = pg.Vector2(*map(float, read().split()))
-            game.spots.append(spot)
+        pos = np.array([tuple(map(float, read().split())) for _ in range(n)], dtype=np.float64).reshape(n, 2)
 
-        # Spots graph
+        # Spots graph, every edge goes to the neighbours of both ends
         m = int(read())
-        gp = game.spots
-        for _ in range(m):
-            i, j = tuple(map(int, read().split()))
-            gp[i].neighbours.append(gp[j])
-            gp[j].neighbours.append(gp[i])
+        edges = np.array([tuple(map(int, read().split())) for _ in range(m)], dtype=np.int64).reshape(m, 2)
+        if m > 0 and (edges.min() < 0 or edges.max() >= n):
+            raise ValueError("Spot index out of range in graph")
+        adj_ptr, adj = graph_csr(n, edges)
 
         # Spots moves map
-        for i in range(n):
-            l, r, u, d = map(int, read().split())
-            game.controller_moves[('L', gp[i])] = gp[l]
-            game.controller_moves[('R', gp[i])] = gp[r]
-            game.controller_moves[('U', gp[i])] = gp[u]
-            game.controller_moves[('D', gp[i])] = gp[d]
+        moves = np.array([tuple(map(int, read().split())) for _ in range(n)], dtype=np.int32).reshape(n, 4)
 
         # Base towers
-        b1, b2 = map(int, read().split())
-        gp[b1].create_tower(BaseTower, game.player_one)
-        gp[b2].create_tower(BaseTower, game.player_two)
+        bases = np.array(tuple(map(int, read().split())), dtype=np.int32)
+
+    return Level(pos, adj_ptr, adj, moves, bases)
+
+
+def graph_csr(n: int, edges: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    # (edges, 2) pairs -> adj_ptr, adj, every edge goes to the neighbours of both ends in file order
+    src = edges.reshape(-1)
+    dst = edges[:, ::-1].reshape(-1)
+    order = np.argsort(src, kind='stable')
+    adj_ptr = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(np.bincount(src, minlength=n), out=adj_ptr[1:])
+    return adj_ptr, dst[order].astype(np.int32)
+
+
+def write_level(level: Level, filename):
+    # text format of parse_level, edges listed once from their lower end
+    src = np.repeat(np.arange(len(level.pos)), np.diff(level.adj_ptr))
+    keep = src < level.adj
+    edges = np.stack([src[keep], level.adj[keep]], axis=1)
+    lines = ['# Spots', str(len(level.pos))]
+    lines += [f"{x:g} {y:g}" for x, y in level.pos.tolist()]
+    lines += ['# Graph', str(len(edges))] + [f"{i} {j}" for i, j in edges.tolist()]
+    lines.append('# Move map')
+    lines += [' '.join(map(str, row)) for row in level.moves.tolist()]
+    lines += ['# Start tower', ' '.join(map(str, level.bases.tolist()))]
+    with open(filename, 'w') as f:
+        f.write('\n'.join(lines) + '\n')
+
+
+def build_game(level: Level, tick_rate: int = None, scheduled_projectiles: bool = False) -> Game:
+    game = Game(tick_rate or consts.TICK_RATE, scheduled_projectiles)
+    game.level = level
+    gp = game.spots
+    for i, (x, y) in enumerate(level.pos.tolist()):
+        spot = Spot(game)
+        spot.index = i
+        spot.pos = pg.Vector2(x, y)
+        gp.append(spot)
+    game.spot_owners = np.zeros(len(gp), dtype=np.int8)
+
+    adj = level.adj.tolist()
+    ptr = level.adj_ptr.tolist()
+    for i, spot in enumerate(gp):
+        spot.neighbours = [gp[j] for j in adj[ptr[i]:ptr[i + 1]]]
+
+    game.controller_moves = ControllerMoves(gp, level.moves)
+    for radius, table in level.ranges.items():
+        game.range_tables[radius] = RangeTable(gp, *table)
+
+    b1, b2 = level.bases.tolist()
+    gp[b1].create_tower(BaseTower, game.player_one)
+    gp[b2].create_tower(BaseTower, game.player_two)
     return game
+
+
+def compiled_name(filename) -> str:
+    return filename + "c"
+
+
+def load_level(filename) -> Level:
+    # compiled artifact if it's there and up to date, text otherwise
+    from basics.level_binary import is_compiled, read_compiled
+
+    if is_compiled(filename):
+        return read_compiled(filename)
+    compiled = compiled_name(filename)
+    if os.path.exists(compiled) and os.path.getmtime(compiled) >= os.path.getmtime(filename):
+        return read_compiled(compiled)
+
+    level = parse_level(filename)
+    level.validate()
+    level.add_standard_ranges()
+    return level
+
+
+def load_from_file(filename, tick_rate: int = None, scheduled_projectiles: bool = False) -> Game:
+    return build_game(load_level(filename), tick_rate, scheduled_projectiles)
+
+
+def clone_game(game: Game) -> Game:
+    # separate game on the same level in the same state
+    clone = build_game(game.level, game.tick_rate, isinstance(game.projectiles, ScheduledProjectileStore))
+    for player, original in zip(clone.players, game.players):
+        player.set_tower_types(list(original.tower_types))
+    clone.restore(game.snapshot())
+    return clone
@@ -0,0 +1,240 @@
+import socket
+import struct
+import threading
+import zlib
+from typing import Optional
+
+from logic.game import Game
+from logic.snapshot import take_snapshot
+from interface.control import Action, Controller, COMMANDS, COMMAND_CODES
+
+# Per tick packet: tick the commands are for, state checksum at the start of the tick they were
+# sent on, number of commands, then one byte per command code
+PACKET = struct.Struct('<IIB')
+PLAYER_ID = struct.Struct('<B')
+SETUP_HASH = struct.Struct('<I')
+
+
+class DesyncError(RuntimeError):
+    pass
+
+
+def state_checksum(game: Game) -> int:
+    snap = take_snapshot(game)
+    crc = zlib.crc32(repr((
+        snap.time, snap.time_to_income, snap.winner, snap.last_tower_uid,
+        [(t[0], t[1].__name__) + t[2:] for t in snap.towers], snap.bans,
+        [(money, [(t.__name__, cd) for t, cd in cds]) for money, cds in snap.players],
+    )).encode())
+    for col in snap.projectiles[1]:
+        crc = zlib.crc32(col.tobytes(), crc)
+    return crc
+
+
+def setup_hash(level: str, tower_types: list, money: int, tick_rate: int, input_delay: int) -> int:
+    with open(level, 'rb') as f:
+        crc = zlib.crc32(f.read())
+    return zlib.crc32(repr(([t.__name__ for t in tower_types], money, tick_rate, input_delay)).encode(), crc)
+
+
+def recv_exact(sock: socket.socket, n: int) -> bytes:
+    data = b''
+    while len(data) < n:
+        chunk = sock.recv(n - len(data))
+        if not chunk:
+            raise ConnectionError("Peer disconnected")
+        data += chunk
+    return data
+
+
+class Link:
+    # TCP connection to the relay, carries per tick command packets of the other player
+    def __init__(self, host: str, port: int):
+        self.sock = socket.create_connection((host, port))
+        self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.player_id, = PLAYER_ID.unpack(recv_exact(self.sock, PLAYER_ID.size))
+        self.bytes_sent = 0
+
+    def handshake(self, setup: int):
+        self.sock.sendall(SETUP_HASH.pack(setup))
+        peer_setup, = SETUP_HASH.unpack(recv_exact(self.sock, SETUP_HASH.size))
+        if peer_setup != setup:
+            raise DesyncError("Players started with different levels or settings")
+
+    def send(self, tick: int, checksum: int, commands: list[list[Action]]):
+        data = PACKET.pack(tick, checksum, len(commands)) + bytes(COMMAND_CODES[tuple(c)] for c in commands)
+        self.sock.sendall(data)
+        self.bytes_sent += len(data)
+
+    def receive(self) -> tuple[int, int, list[list[Action]]]:
+        tick, checksum, n = PACKET.unpack(recv_exact(self.sock, PACKET.size))
+        codes = recv_exact(self.sock, n)
+        return tick, checksum, [COMMANDS[code] for code in codes]
+
+    def finish(self, timeout: float = 5.0):
+        # end of the match: stop sending, then read what the other player still sends until they stop
+        # too, so that neither side closes on unread data and breaks the pipe of the other
+        try:
+            self.sock.shutdown(socket.SHUT_WR)
+            self.sock.settimeout(timeout)
+            while self.sock.recv(4096):
+                pass
+        except OSError:
+            pass
+        self.close()
+
+    def close(self):
+        self.sock.close()
+
+
+class Lockstep:
+    # Both players simulate the same game. Commands given on tick t are applied on tick t + input_delay
+    # by both sides, each tick waits for the commands of the other player.
+    def __init__(self, game: Game, link: Link, controllers: tuple[Controller, Controller], input_delay: int):
+        self.game = game
+        self.link = link
+        self.controllers = controllers
+        self.local_id = link.player_id
+        self.input_delay = input_delay
+
+        # tick -> local commands to apply then
+        self.pending: dict[int, list[list[Action]]] = {}
+        # tick -> local state checksum at its start
+        self.checksums: dict[int, int] = {}
+
+    def exchange(self, local_commands: list[list[Action]]):
+        # call once per tick before game.update()
+        t = self.game.time
+        checksum = state_checksum(self.game)
+        self.checksums[t] = checksum
+        self.pending[t + self.input_delay] = local_commands
+        self.link.send(t + self.input_delay, checksum, local_commands)
+
+        commands = {self.local_id: self.pending.pop(t, [])}
+        remote_id = 3 - self.local_id
+        if t < self.input_delay:
+            commands[remote_id] = []
+        else:
+            tick, remote_checksum, commands[remote_id] = self.link.receive()
+            if tick != t:
+                raise DesyncError(f"Got commands for tick {tick} on tick {t}")
+            sent_on = t - self.input_delay
+            if self.checksums.pop(sent_on) != remote_checksum:
+                raise DesyncError(f"Game states differ on tick {sent_on}")
+
+        # same order on both sides
+        for cnt in self.controllers:
+            cnt.apply(commands[cnt.player.id])
+
+
+def run_relay(port: int, host: str = '127.0.0.1', ready: Optional[threading.Event] = None):
+    # waits for two players and forwards everything each of them sends to the other
+    server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    server.bind((host, port))
+    server.listen(2)
+    if ready is not None:
+        ready.set()
+
+    clients = []
+    for pid in (1, 2):
+        conn, _ = server.accept()
+        conn.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        conn.sendall(PLAYER_ID.pack(pid))
+        clients.append(conn)
+    server.close()
+
+    def pump(src: socket.socket, dst: socket.socket):
+        # a player that stopped sending is only half closed, the other one may still be sending
+        forward = True
+        try:
+            while data := src.recv(4096):
+                if forward:
+                    try:
+                        dst.sendall(data)
+                    except OSError:
+                        # the other player is gone, the rest is dropped
+                        forward = False
+        except OSError:
+            pass
+        try:
+            dst.shutdown(socket.SHUT_WR)
+        except OSError:
+            pass
+
+    threads = [
+        threading.Thread(target=pump, args=(clients[0], clients[1]), daemon=True),
+        threading.Thread(target=pump, args=(clients[1], clients[0]), daemon=True),
+    ]
+    for th in threads:
+        th.start()
+    for th in threads:
+        th.join()
+    for conn in clients:
+        conn.close()
+
+
+def make_net_game(level: str, tick_rate: int) -> Game:
+    from basics.load import load_from_file
+    from logic.towers import LongRangeTower, MiningTower, ShortRangeTower
+
+    game = load_from_file(level, tick_rate)
+    for player in game.players:
+        player.set_tower_types([MiningTower, LongRangeTower, ShortRangeTower])
+        player.money += NET_START_MONEY
+    return game
+
+
+NET_START_MONEY = 100
+
+
+def net_setup_hash(game: Game, level: str, input_delay: int) -> int:
+    return setup_hash(level, game.player_one.tower_types, NET_START_MONEY, game.tick_rate, input_delay)
+
+
+def play(host: str, port: int, level: str, tick_rate: int, input_delay: int):
+    # rendered match against the player on the other end of the relay
+    from basics.session import Session
+
+    class NetSession(Session):
+        def _apply_controls(self, buttons):
+            local = self.controller_one if link.player_id == 1 else self.controller_two
+            lockstep.exchange(local.commands(buttons))
+
+    link = Link(host, port)
+    game = make_net_game(level, tick_rate)
+    link.handshake(net_setup_hash(game, level, input_delay))
+    session = NetSession(game)
+    lockstep = Lockstep(game, link, (session.controller_one, session.controller_two), input_delay)
+    try:
+        session.loop()
+    except ConnectionError:
+        link.close()
+    else:
+        link.finish()
+
+
+def run_headless_peer(host: str, port: int, level: str, tick_rate: int, input_delay: int,
+                      ticks: int, seed: int) -> tuple[int, int, float]:
+    # random player for testing, returns player id, final state checksum and bytes sent per tick
+    from interface.control import RandomController
+
+    link = Link(host, port)
+    game = make_net_game(level, tick_rate)
+    link.handshake(net_setup_hash(game, level, input_delay))
+    controllers = (
+        RandomController(game, game.player_one, seed=seed),
+        RandomController(game, game.player_two, seed=seed),
+    )
+    local = controllers[link.player_id - 1]
+    local.rng.seed(seed + link.player_id)
+    lockstep = Lockstep(game, link, controllers, input_delay)
+    try:
+        for _ in range(ticks):
+            lockstep.exchange(local.commands([]))
+            game.update()
+    except BaseException:
+        link.close()
+        raise
+    link.finish()
+    return link.player_id, state_checksum(game), link.bytes_sent / ticks
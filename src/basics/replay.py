@@ -0,0 +1,127 @@
+import struct
+
+from basics.load import load_from_file
+from basics.headless import HeadlessSession
+from logic.game import Game
+from logic.towers import TOWER_TYPES
+from interface.control import Action, Controller, ScriptedController, COMMANDS, COMMAND_CODES
+
+# File layout (little endian):
+#   header   magic, version
+#   strings  level file, comma separated tower type names (u16 length + utf-8)
+#   setup    starting money of both players, match length in ticks, number of events, tick rate
+#   events   (tick: u32, player id << 4 | command code: u8) each
+MAGIC = b'TORP'
+VERSION = 2
+HEADER = struct.Struct('<4sH')
+SETUP = struct.Struct('<qqIIH')
+EVENT = struct.Struct('<IB')
+STR_LEN = struct.Struct('<H')
+
+
+class Recorder:
+    def __init__(self, game: Game, level: str, filename: str):
+        self.game = game
+        self.level = level
+        self.filename = filename
+
+        self.tower_types = [t.__name__ for t in game.player_one.tower_types]
+        self.money = (game.player_one.money, game.player_two.money)
+        self.events: list[tuple[int, int, int]] = []
+
+    def attach(self, controllers: tuple[Controller, ...]):
+        for cnt in controllers:
+            cnt.recorder = self
+
+    def record(self, tick: int, player_id: int, commands: list[list[Action]]):
+        for command in commands:
+            self.events.append((tick, player_id, COMMAND_CODES[tuple(command)]))
+
+    def save(self):
+        with open(self.filename, 'wb') as f:
+            f.write(HEADER.pack(MAGIC, VERSION))
+            write_str(f, self.level)
+            write_str(f, ','.join(self.tower_types))
+            f.write(SETUP.pack(*self.money, self.game.time, len(self.events), self.game.tick_rate))
+            f.write(b''.join(EVENT.pack(tick, pid << 4 | code) for tick, pid, code in self.events))
+
+
+class Replay:
+    def __init__(self, level: str, tower_types: list, money: tuple[int, int], ticks: int,
+                 events: list[tuple[int, int, int]], tick_rate: int):
+        self.level = level
+        self.tower_types = tower_types
+        self.money = money
+        self.ticks = ticks
+        self.events = events
+        self.tick_rate = tick_rate
+
+    def make_game(self, scheduled_projectiles: bool = False) -> Game:
+        game = load_from_file(self.level, self.tick_rate, scheduled_projectiles)
+        for player, money in zip(game.players, self.money):
+            player.set_tower_types(self.tower_types)
+            player.money += money
+        return game
+
+    def make_controllers(self, game: Game) -> tuple[ScriptedController, ScriptedController]:
+        scripts = {1: {}, 2: {}}
+        for tick, pid, code in self.events:
+            scripts[pid].setdefault(tick, []).append(COMMANDS[code])
+        return (
+            ScriptedController(game, game.player_one, scripts[1]),
+            ScriptedController(game, game.player_two, scripts[2]),
+        )
+
+    def run_headless(self, scheduled_projectiles: bool = False) -> tuple[Game, float]:
+        # returns the final state and ticks per second
+        game = self.make_game(scheduled_projectiles)
+        session = HeadlessSession(game, self.make_controllers(game))
+        tps = session.run(self.ticks)
+        return game, tps
+
+    def run_captured(self, writer, stride: int = 1, start: int = 0,
+                     scheduled_projectiles: bool = False) -> tuple[Game, int, float]:
+        # draws the match offscreen, returns the final state, captured frames and frames per second
+        from basics.capture import CaptureSession
+
+        game = self.make_game(scheduled_projectiles)
+        session = CaptureSession(game, self.make_controllers(game), writer, stride, start)
+        fps = session.run(self.ticks)
+        return game, session.frames, fps
+
+    def run_rendered(self, scheduled_projectiles: bool = False):
+        from basics.session import Session
+
+        game = self.make_game(scheduled_projectiles)
+        session = Session(game, self.make_controllers(game))
+        while not session.is_finished and game.time < self.ticks:
+            session.frame()
+        return game
+
+
+def load_replay(filename) -> Replay:
+    with open(filename, 'rb') as f:
+        magic, version = HEADER.unpack(f.read(HEADER.size))
+        if magic != MAGIC:
+            raise ValueError(f"Not a replay file: {filename}")
+        if version != VERSION:
+            raise ValueError(f"Unsupported replay version: {version}")
+        level = read_str(f)
+        tower_types = [TOWER_TYPES[name] for name in read_str(f).split(',') if name]
+        money_one, money_two, ticks, n, tick_rate = SETUP.unpack(f.read(SETUP.size))
+        events = [
+            (tick, code >> 4, code & 0xF)
+            for tick, code in EVENT.iter_unpack(f.read(EVENT.size * n))
+        ]
+    return Replay(level, tower_types, (money_one, money_two), ticks, events, tick_rate)
+
+
+def write_str(f, s: str):
+    data = s.encode()
+    f.write(STR_LEN.pack(len(data)))
+    f.write(data)
+
+
+def read_str(f) -> str:
+    n, = STR_LEN.unpack(f.read(STR_LEN.size))
+    return f.read(n).decode()
@@ -1,57 +1,208 @@
+import math
+import queue
+import threading
+import time
+from typing import Optional
+
 import pygame as pg
 
 from logic.game import Game
 from interface.draw import Drawer
+from interface.render_state import RenderBuffer
 from logic import consts
-from interface.control import KeyboardController
+from interface.control import Controller, KeyboardController
+from basics.replay import Recorder
+from logic.profiling import Profiler
 
 
 class Session:
-    def __init__(self, game: Game):
+    def __init__(self, game: Game, controllers: Optional[tuple[Controller, Controller]] = None):
         self.game = game
 
         pg.init()
         pg.font.init()
 
         self.screen = pg.display.set_mode((1000, 800))
-        self.controller_one = KeyboardController(self.screen, game, game.player_one)
-        self.controller_two = KeyboardController(self.screen, game, game.player_two)
+        if controllers is None:
+            controllers = (
+                KeyboardController(self.screen, game, game.player_one),
+                KeyboardController(self.screen, game, game.player_two),
+            )
+        self.controller_one, self.controller_two = controllers
         self.drawer = Drawer(self.screen, game, (self.controller_one, self.controller_two))
 
-        self.frame_time = round(1000 / consts.FPS)
-        self.ts = pg.time.get_ticks()
+        # simulation runs in fixed steps, frames are drawn as often as allowed
+        self.tick_time = 1 / game.tick_rate
+        self.frame_time = 1 / consts.FPS if consts.FPS > 0 else 0.0
+        # at least enough for a whole frame with some lag
+        self.max_catch_up = max(consts.MAX_CATCH_UP_TICKS, math.ceil(self.frame_time / self.tick_time) + 1)
+        self.ts = time.perf_counter()
+        self.lag = 0.0
+
         self.is_finished = False
+        self.recorder: Optional[Recorder] = None
+        self.profiler: Optional[Profiler] = None
+
+        # threaded mode: keys pressed since the last tick, the state the last tick left to draw and
+        # the part of the level the next state is taken for, set by the render thread as a whole
+        self.pressed: queue.SimpleQueue = queue.SimpleQueue()
+        self.render_buffer = RenderBuffer()
+        self.capture_area: Optional[tuple[float, float, float, float]] = None
 
     def frame(self):
-        self._handle_controls()
-        self.game.update()
-        self.drawer.draw_game()
+        prof = self.profiler
+        if prof is not None:
+            t = prof.start()
+
+        now = time.perf_counter()
+        self.lag += now - self.ts
+        self.ts = now
+        self._handle_camera()
+
+        steps = 0
+        while self.lag >= self.tick_time and steps < self.max_catch_up and not self.is_finished:
+            if prof is not None and steps > 0:
+                # one row per tick: draw and wait go to the last tick of the frame,
+                # or to the next one when a frame runs no tick
+                prof.end_tick(self.game.time)
+            self._handle_controls()
+            if prof is not None:
+                t = prof.lap('controls', t)
+            self.game.update()
+            if prof is not None:
+                t = prof.lap('update', t)
+            self.lag -= self.tick_time
+            steps += 1
+        if steps == self.max_catch_up:
+            # too slow to keep up, drop the lag instead of spiralling
+            self.lag = min(self.lag, self.tick_time)
+
+        self.drawer.draw_game(self.lag / self.tick_time)
+        if prof is not None:
+            t = prof.lap('draw', t)
         self._wait()
+        if prof is not None:
+            prof.lap('wait', t)
+            if steps > 0:
+                prof.end_tick(self.game.time)
 
-    def loop(self):
-        while not self.is_finished:
-            self.frame()
+    def loop(self, threaded: bool = False):
+        self.ts = time.perf_counter()
+        if threaded:
+            self.run_threaded()
+        else:
+            while not self.is_finished:
+                self.frame()
+        self.controller_one.close()
+        self.controller_two.close()
+        if self.recorder is not None:
+            self.recorder.save()
+        if self.profiler is not None:
+            self.profiler.close()
+
+    def run_threaded(self):
+        # the game runs on a worker thread and publishes a render state every tick,
+        # this thread polls input and draws the latest state, neither waits for the other
+        self.capture_area = self.drawer.capture_area()
+        self.render_buffer.publish(self.drawer.capture(self.capture_area))
+        worker = threading.Thread(target=self.simulate, daemon=True)
+        worker.start()
+        try:
+            while not self.is_finished:
+                start = time.perf_counter()
+                self._handle_camera()
+                buttons = [e.key for e in pg.event.get(pg.KEYDOWN)]
+                if buttons:
+                    self.pressed.put(buttons)
+                state, age = self.render_buffer.latest()
+                self.drawer.draw_game(min(1.0, age / self.tick_time), state)
+                # the camera is only touched here, the worker gets a copy of what it sees
+                self.capture_area = self.drawer.capture_area()
+                wait_time = self.frame_time - (time.perf_counter() - start)
+                if wait_time > 0:
+                    time.sleep(wait_time)
+        finally:
+            self.is_finished = True
+            worker.join()
+
+    def simulate(self):
+        next_tick = time.perf_counter()
+        try:
+            while not self.is_finished:
+                buttons = []
+                while not self.pressed.empty():
+                    buttons += self.pressed.get()
+                self._apply_buttons(buttons)
+                self.game.update()
+                if self.profiler is not None:
+                    self.profiler.end_tick(self.game.time)
+                self.render_buffer.publish(self.drawer.capture(self.capture_area))
+
+                next_tick += self.tick_time
+                wait_time = next_tick - time.perf_counter()
+                if wait_time > 0:
+                    time.sleep(wait_time)
+                elif wait_time < -self.max_catch_up * self.tick_time:
+                    # too slow to keep up, drop the lag instead of spiralling
+                    next_tick = time.perf_counter()
+        finally:
+            self.is_finished = True
+
+    def enable_profiling(self, csv_file: Optional[str] = None):
+        if self.profiler is None:
+            self.profiler = Profiler(csv_file)
+            self.game.profiler = self.profiler
+
+    def toggle_profile_overlay(self):
+        self.enable_profiling()
+        self.drawer.profile_overlay = None if self.drawer.profile_overlay is not None else self.profiler
+
+    def set_controller(self, pid: int, controller: Controller):
+        if pid == 0:
+            self.controller_one = controller
+        else:
+            self.controller_two = controller
+        self.drawer.controllers = (self.controller_one, self.controller_two)
+
+    def start_recording(self, level: str, filename: str):
+        self.recorder = Recorder(self.game, level, filename)
+        self.recorder.attach((self.controller_one, self.controller_two))
 
     def _wait(self):
-        # TODO: dynamic frametime
-        ts = pg.time.get_ticks()
-        wait_time = self.frame_time - (ts - self.ts)
-        # print(f"wait time = {wait_time}")
+        wait_time = self.frame_time - (time.perf_counter() - self.ts)
         if wait_time > 0:
-            pg.time.wait(wait_time)
-        self.ts = pg.time.get_ticks()
+            time.sleep(wait_time)
 
     def _handle_controls(self):
         buttons = list(map(
             lambda e: e.key,
             pg.event.get(pg.KEYDOWN)
         ))
+        self._apply_buttons(buttons)
 
-        self.controller_one.handle(buttons)
-        self.controller_two.handle(buttons)
+    def _handle_camera(self):
+        # mouse wheel zooms, dragging with the right button pans, middle click follows the pointers again
+        camera = self.drawer.camera
+        for e in pg.event.get((pg.MOUSEWHEEL, pg.MOUSEMOTION, pg.MOUSEBUTTONDOWN)):
+            if e.type == pg.MOUSEWHEEL:
+                camera.zoom_by(e.y, pg.mouse.get_pos())
+            elif e.type == pg.MOUSEMOTION and e.buttons[2]:
+                camera.follow = False
+                camera.pan(*e.rel)
+            elif e.type == pg.MOUSEBUTTONDOWN and e.button == 2:
+                camera.reset()
+
+    def _apply_buttons(self, buttons):
+        self._apply_controls(buttons)
 
         if pg.K_ESCAPE in buttons:
             self.is_finished = True
+        if pg.K_F3 in buttons:
+            self.toggle_profile_overlay()
+
+    def _apply_controls(self, buttons):
+        self.controller_one.handle(buttons)
+        self.controller_two.handle(buttons)
 
     def set_tower_types(self, tower_types):
         self.game.player_one.set_tower_types(tower_types)
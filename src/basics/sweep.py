@@ -0,0 +1,149 @@
+import csv
+import itertools
+import os
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+
+from basics.load import load_from_file
+from basics.headless import HeadlessSession
+from interface.control import RandomController
+from logic import consts
+from logic.towers import TOWER_TYPES, LongRangeTower, MiningTower, ShortRangeTower
+
+# Tower stats copied from consts when towers.py was imported
+LINKED_PARAMS = {
+    'RANGE_LONG': ['LongRangeTower.ATTACK_RANGE'],
+    'RANGE_SHORT': ['ShortRangeTower.ATTACK_RANGE', 'BaseTower.ATTACK_RANGE'],
+}
+
+_INHERITED = object()
+
+MATCH_TOWER_TYPES = [MiningTower, LongRangeTower, ShortRangeTower]
+START_MONEY = 100
+
+
+def resolve_param(name: str):
+    # "INCOME_BASIC" lives in consts, "LongRangeTower.COST" on a tower class
+    if '.' in name:
+        type_name, attr = name.split('.', 1)
+        owner = TOWER_TYPES[type_name]
+    else:
+        owner, attr = consts, name
+    if not hasattr(owner, attr):
+        raise ValueError(f"Unknown parameter: {name}")
+    return owner, attr
+
+
+@contextmanager
+def overridden(params: dict):
+    saved = []
+    try:
+        for name, value in params.items():
+            for full_name in [name] + LINKED_PARAMS.get(name, []):
+                owner, attr = resolve_param(full_name)
+                saved.append((owner, attr, vars(owner).get(attr, _INHERITED)))
+                setattr(owner, attr, value)
+        yield
+    finally:
+        for owner, attr, value in reversed(saved):
+            if value is _INHERITED:
+                delattr(owner, attr)
+            else:
+                setattr(owner, attr, value)
+
+
+def parse_value(text: str):
+    for typ in (int, float):
+        try:
+            return typ(text)
+        except ValueError:
+            pass
+    raise ValueError(f"Not a number: {text}")
+
+
+def parse_grid(specs: list[str]) -> list[dict]:
+    # ["INCOME_BASIC=10,20", "RANGE_LONG=150,170"] -> every combination
+    names, values = [], []
+    for spec in specs:
+        name, vals = spec.split('=', 1)
+        resolve_param(name)
+        names.append(name)
+        values.append([parse_value(v) for v in vals.split(',')])
+    return [dict(zip(names, combo)) for combo in itertools.product(*values)]
+
+
+def run_match(level: str, seed: int, max_ticks: int) -> dict:
+    game = load_from_file(level)
+    controllers = (
+        RandomController(game, game.player_one, seed=2 * seed, press_chance=0.3),
+        RandomController(game, game.player_two, seed=2 * seed + 1, press_chance=0.3),
+    )
+    session = HeadlessSession(game, controllers)
+    session.set_tower_types(MATCH_TOWER_TYPES)
+    for player in game.players:
+        player.money += START_MONEY
+
+    # money and tower count of both players once per income period
+    economy = []
+    while game.winner is None and game.time < max_ticks:
+        session.frame()
+        if game.time % game.ticks(consts.INCOME_PERIOD) == 0:
+            towers = [0, 0]
+            for tower in game.towers.values():
+                towers[tower.player.id - 1] += 1
+            economy.append((game.player_one.money, game.player_two.money, *towers))
+
+    return {
+        'winner': game.winner.id if game.winner is not None else 0,
+        'ticks': game.time,
+        'economy': economy,
+    }
+
+
+def run_task(task: tuple) -> tuple:
+    # runs in a worker process, overrides never outlive the task
+    combo_id, params, level, seed, max_ticks = task
+    with overridden(params):
+        result = run_match(level, seed, max_ticks)
+    return combo_id, level, result
+
+
+def sweep(grid: list[dict], levels: list[str], matches: int, max_ticks: int, workers: int = None):
+    tasks = [
+        (combo_id, params, level, seed, max_ticks)
+        for combo_id, params in enumerate(grid)
+        for level in levels
+        for seed in range(matches)
+    ]
+    workers = workers or os.cpu_count()
+    results: dict[tuple[int, str], list[dict]] = {}
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for combo_id, level, result in pool.map(run_task, tasks, chunksize=max(1, len(tasks) // (4 * workers))):
+            results.setdefault((combo_id, level), []).append(result)
+    return results
+
+
+def write_results(grid: list[dict], results: dict, filename: str):
+    names = list(grid[0]) if grid else []
+    with open(filename, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(names + ['level', 'matches', 'p1_win_rate', 'p2_win_rate', 'draw_rate', 'mean_ticks'])
+        for (combo_id, level), matches in sorted(results.items()):
+            n = len(matches)
+            wins = [sum(m['winner'] == w for m in matches) / n for w in (1, 2, 0)]
+            mean_ticks = sum(m['ticks'] for m in matches) / n
+            writer.writerow([grid[combo_id][name] for name in names] + [level, n, *wins, mean_ticks])
+
+
+def write_economy(grid: list[dict], results: dict, filename: str):
+    # mean over matches still running at each income period
+    names = list(grid[0]) if grid else []
+    with open(filename, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(names + ['level', 'period', 'matches', 'p1_money', 'p2_money', 'p1_towers', 'p2_towers'])
+        for (combo_id, level), matches in sorted(results.items()):
+            length = max(len(m['economy']) for m in matches)
+            for period in range(length):
+                rows = [m['economy'][period] for m in matches if period < len(m['economy'])]
+                means = [sum(col) / len(rows) for col in zip(*rows)]
+                writer.writerow([grid[combo_id][name] for name in names] + [level, period + 1, len(rows), *means])
@@ -0,0 +1,38 @@
+import argparse
+import time
+
+import numpy as np
+
+from basics.batch_env import BatchEnv, ShardedBatchEnv, random_opponent
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Step many games with random actions and report the throughput")
+    parser.add_argument("level", nargs="?", default="levels/grid.lvl")
+    parser.add_argument("--envs", type=int, default=64)
+    parser.add_argument("--steps", type=int, default=500)
+    parser.add_argument("--shards", type=int, default=0, help="worker processes, 0 to step in this process")
+    parser.add_argument("--frame-skip", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    kwargs = dict(frame_skip=args.frame_skip, opponent=random_opponent, seed=args.seed)
+    if args.shards > 0:
+        env = ShardedBatchEnv(args.level, args.envs, args.shards, **kwargs)
+    else:
+        env = BatchEnv(args.level, args.envs, **kwargs)
+    rng = np.random.default_rng(args.seed)
+    env.reset()
+    num_actions = env.num_actions
+
+    episodes = 0
+    start = time.perf_counter()
+    for _ in range(args.steps):
+        # mostly idle, like a player that presses a button now and then
+        actions = rng.integers(0, num_actions, args.envs) * (rng.random(args.envs) < 0.05)
+        obs, rewards, dones = env.step(actions)
+        episodes += int(dones.sum())
+    elapsed = time.perf_counter() - start
+    env.close()
+    print(f"{args.envs * args.steps} env-steps in {elapsed:.2f}s, {args.envs * args.steps / elapsed:.0f} env-steps/sec,"
+          f" {episodes} games finished")
@@ -0,0 +1,39 @@
+import argparse
+import os
+import sys
+
+from basics import bench
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the simulation and drawing")
+    parser.add_argument("--out", default="bench.json")
+    parser.add_argument("--history", help="also append the run to this JSON lines file")
+    parser.add_argument("--sizes", type=int, nargs="*", default=bench.SYNTHETIC_SIZES)
+    parser.add_argument("--densities", type=float, nargs="*", default=bench.DENSITIES)
+    parser.add_argument("--no-draw", action="store_true")
+    parser.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"), help="compare two saved runs")
+    parser.add_argument("--threshold", type=float, default=0.1, help="slowdown counted as regression")
+    parser.add_argument("--memory", action="store_true", help="report bytes per spot, tower, player and projectile")
+    args = parser.parse_args()
+
+    if args.memory:
+        for key, value in bench.memory_report().items():
+            print(f"{key:26} {value}")
+        sys.exit(0)
+
+    if args.compare is not None:
+        rows = bench.compare(bench.load(args.compare[0]), bench.load(args.compare[1]), args.threshold)
+        for r in rows:
+            flag = "REGRESSION" if r['regression'] else ""
+            print(f"{r['name']:24} {r['level']:20} {r['density']:4} "
+                  f"{r['old_s'] * 1000:10.3f}ms {r['new_s'] * 1000:10.3f}ms {r['ratio']:6.2f}x {flag}")
+        sys.exit(1 if any(r['regression'] for r in rows) else 0)
+
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    report = bench.run_suite(args.sizes, args.densities, not args.no_draw)
+    for r in report['results']:
+        print(f"{r['name']:24} {r['level']:20} {r['density']:4} {r['min_s'] * 1000:10.3f}ms")
+    bench.save(report, args.out)
+    if args.history is not None:
+        bench.append_history(report, args.history)
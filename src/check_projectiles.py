@@ -0,0 +1,77 @@
+import argparse
+import sys
+
+from basics.headless import HeadlessSession
+from basics.load import load_from_file
+from basics.replay import load_replay
+from interface.control import RandomController
+from logic.game import Game
+from logic.towers import LongRangeTower, MiningTower, ShortRangeTower
+
+
+def state(game: Game) -> tuple:
+    return (
+        tuple((uid, t.hp) for uid, t in sorted(game.towers.items())),
+        tuple(p.money for p in game.players),
+        game.winner.id if game.winner is not None else 0,
+    )
+
+
+def first_difference(sessions: list[HeadlessSession], ticks: int):
+    # tick where the stepped and the scheduled game differ, None if they never do
+    for _ in range(ticks):
+        for session in sessions:
+            session.frame()
+        if state(sessions[0].game) != state(sessions[1].game):
+            return sessions[0].game.time
+    return None
+
+
+def replay_sessions(filename: str) -> tuple[list[HeadlessSession], int]:
+    replay = load_replay(filename)
+    sessions = []
+    for scheduled in (False, True):
+        game = replay.make_game(scheduled)
+        sessions.append(HeadlessSession(game, replay.make_controllers(game)))
+    return sessions, replay.ticks
+
+
+def random_sessions(level: str, seed: int) -> list[HeadlessSession]:
+    sessions = []
+    for scheduled in (False, True):
+        game = load_from_file(level, scheduled_projectiles=scheduled)
+        session = HeadlessSession(game, (
+            RandomController(game, game.player_one, seed=seed, press_chance=0.3),
+            RandomController(game, game.player_two, seed=seed + 1, press_chance=0.3),
+        ))
+        session.set_tower_types([MiningTower, LongRangeTower, ShortRangeTower])
+        for player in game.players:
+            player.money += 1000
+        sessions.append(session)
+    return sessions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Play matches with stepped and with scheduled projectiles and compare tower hp every tick"
+    )
+    parser.add_argument("replays", nargs="*", help="recorded matches")
+    parser.add_argument("--levels", nargs="*", default=[], help="also play random matches on these levels")
+    parser.add_argument("--seeds", type=int, default=10, help="random matches per level")
+    parser.add_argument("--ticks", type=int, default=60 * 60 * 5, help="length of the random matches")
+    args = parser.parse_args()
+
+    matches = [(name, *replay_sessions(name)) for name in args.replays]
+    for level in args.levels:
+        for seed in range(args.seeds):
+            matches.append((f"{level} seed {seed}", random_sessions(level, seed), args.ticks))
+
+    failed = 0
+    for name, sessions, ticks in matches:
+        tick = first_difference(sessions, ticks)
+        if tick is None:
+            print(f"{name}: same for {ticks} ticks")
+        else:
+            failed += 1
+            print(f"{name}: differs on tick {tick}")
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,18 @@
+import argparse
+
+from basics.load import compiled_name
+from basics.level_binary import compile_level
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Validate level files and compile them to the binary format")
+    parser.add_argument("levels", nargs="+")
+    parser.add_argument("-o", "--out", help="output file, only with a single level (default: <level>c)")
+    args = parser.parse_args()
+
+    if args.out is not None and len(args.levels) > 1:
+        parser.error("--out needs a single level")
+    for src in args.levels:
+        dst = args.out or compiled_name(src)
+        level = compile_level(src, dst)
+        print(f"{src} -> {dst}: {len(level.pos)} spots, {len(level.adj) // 2} edges")
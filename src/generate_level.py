@@ -0,0 +1,31 @@
+import argparse
+import time
+
+from basics.generate import SYMMETRIES, TOPOLOGIES, generate_level
+from basics.level_binary import write_compiled
+from basics.load import compiled_name, write_level
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate a level with its pointer move map")
+    parser.add_argument("spots", type=int, help="about this many spots")
+    parser.add_argument("out", help="level file to write")
+    parser.add_argument("--topology", choices=TOPOLOGIES, default="grid",
+                        help="lattice, or random spots linked to the ones nearby")
+    parser.add_argument("--symmetry", choices=SYMMETRIES, default="none",
+                        help="the right half mirrors or rotates the left one")
+    parser.add_argument("--spacing", type=float, default=100, help="distance between neighbouring spots")
+    parser.add_argument("--diagonals", action="store_true", help="grid spots are linked diagonally too")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--compile", action="store_true", help="also write the compiled level next to it")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    level = generate_level(args.spots, args.topology, args.symmetry, args.spacing, args.seed, args.diagonals)
+    generated = time.perf_counter() - start
+    write_level(level, args.out)
+    if args.compile:
+        level.add_standard_ranges()
+        write_compiled(level, compiled_name(args.out))
+    print(f"{args.out}: {len(level.pos)} spots, {len(level.adj) // 2} edges, "
+          f"generated in {generated:.2f}s, written in {time.perf_counter() - start - generated:.2f}s")
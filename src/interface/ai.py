@@ -0,0 +1,223 @@
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Optional
+
+from basics.load import Level, build_game, clone_game
+from logic.game import ControllerMoves, Game, Player
+from logic.projectiles import ScheduledProjectileStore
+from logic.snapshot import Snapshot
+from logic.towers import TOWER_TYPES
+from interface.control import Action, Controller, ACTIONS_TOWER
+
+# Candidate actions: ('none',), ('build', spot index, tower type index), ('focus', spot index)
+NO_ACTION = ('none',)
+WIN_SCORE = 1e9
+
+
+def evaluate(game: Game, player_id: int) -> float:
+    # tower value left on the board and money, own minus the opponent's
+    if game.winner is not None:
+        return WIN_SCORE if game.winner.id == player_id else -WIN_SCORE
+    score = 0.0
+    for t in game.towers.values():
+        value = t.COST * t.hp / t.stats.max_hp
+        score += value if t.player.id == player_id else -value
+    for p in game.players:
+        score += p.money / 2 if p.id == player_id else -p.money / 2
+    return score
+
+
+def apply_action(game: Game, player: Player, action: tuple):
+    # what the commands of the action do, without moving a pointer
+    if action[0] == 'build':
+        game.spots[action[1]].ask_build_tower(player.tower_types[action[2]], player)
+    elif action[0] == 'focus':
+        target = game.spots[action[1]].tower
+        for t in list(player.towers.values()):
+            t.ask_set_target(target)
+
+
+class LocalSearch:
+    # rollouts one after another on a private copy of the game, resumable between ticks
+    CHUNK = 1
+
+    def __init__(self, sim: Game, root: Snapshot, player_id: int, candidates: list[tuple], horizon: int):
+        self.sim = sim
+        self.root = root
+        self.player_id = player_id
+        self.candidates = candidates
+        self.horizon = horizon
+        self.scores: list[float] = []
+        self.rollout_end: Optional[int] = None
+
+    def advance(self, deadline: float) -> bool:
+        # works until the deadline, returns True when every candidate is scored
+        sim = self.sim
+        while len(self.scores) < len(self.candidates):
+            if time.perf_counter() >= deadline:
+                return False
+            if self.rollout_end is None:
+                sim.restore(self.root)
+                apply_action(sim, sim.players[self.player_id - 1], self.candidates[len(self.scores)])
+                self.rollout_end = sim.time + self.horizon
+            for _ in range(min(self.CHUNK, self.rollout_end - sim.time)):
+                sim.update()
+            if sim.time >= self.rollout_end or sim.winner is not None:
+                self.scores.append(evaluate(sim, self.player_id))
+                self.rollout_end = None
+        return True
+
+
+class PoolSearch:
+    # rollouts in worker processes, each with its own copy of the level
+    def __init__(self, pool: ProcessPoolExecutor, root: Snapshot, player_id: int, candidates: list[tuple],
+                 horizon: int):
+        self.candidates = candidates
+        self.futures: list[Future] = [
+            pool.submit(_worker_rollout, root, player_id, action, horizon) for action in candidates
+        ]
+        self.scores: list[float] = []
+
+    def advance(self, deadline: float) -> bool:
+        if not all(f.done() for f in self.futures):
+            return False
+        self.scores = [f.result() for f in self.futures]
+        return True
+
+
+_worker_game: Optional[Game] = None
+
+
+def _init_worker(level: Level, tick_rate: int, scheduled_projectiles: bool, tower_types: list[list[str]]):
+    global _worker_game
+    _worker_game = build_game(level, tick_rate, scheduled_projectiles)
+    for player, names in zip(_worker_game.players, tower_types):
+        player.set_tower_types([TOWER_TYPES[name] for name in names])
+
+
+def _worker_rollout(root: Snapshot, player_id: int, action: tuple, horizon: int) -> float:
+    sim = _worker_game
+    sim.restore(root)
+    apply_action(sim, sim.players[player_id - 1], action)
+    end = sim.time + horizon
+    while sim.time < end and sim.winner is None:
+        sim.update()
+    return evaluate(sim, player_id)
+
+
+class AIController(Controller):
+    # Every decision_interval ticks scores the candidate actions by playing the game forward
+    # horizon ticks, then moves the pointer and presses the buttons of the best one.
+    # Spends at most budget seconds per tick, a decision can take several ticks.
+    def __init__(self, game: Game, player: Player, budget: float = 0.004, horizon: int = 120,
+                 decision_interval: int = 30, max_candidates: int = 24, workers: int = 0):
+        super().__init__(game, player)
+        self.budget = budget
+        self.horizon = horizon
+        self.decision_interval = decision_interval
+        self.max_candidates = max_candidates
+
+        self.sim = clone_game(game)
+        self.pool: Optional[ProcessPoolExecutor] = None
+        if workers > 0:
+            tower_types = [[t.__name__ for t in p.tower_types] for p in game.players]
+            scheduled = isinstance(game.projectiles, ScheduledProjectileStore)
+            self.pool = ProcessPoolExecutor(
+                workers, initializer=_init_worker, initargs=(game.level, game.tick_rate, scheduled, tower_types)
+            )
+        self.search = None
+        self.next_decision = 0
+
+    def commands(self, buttons) -> list[list[Action]]:
+        deadline = time.perf_counter() + self.budget
+        if self.search is None:
+            if self.game.time < self.next_decision:
+                return []
+            candidates = self.candidates()
+            if len(candidates) == 1:
+                self.next_decision = self.game.time + self.decision_interval
+                return []
+            # the private copy only needs the tower types once
+            for player, original in zip(self.sim.players, self.game.players):
+                if player.tower_types != original.tower_types:
+                    player.set_tower_types(list(original.tower_types))
+            root = self.game.snapshot()
+            if self.pool is not None:
+                self.search = PoolSearch(self.pool, root, self.player.id, candidates, self.horizon)
+            else:
+                self.search = LocalSearch(self.sim, root, self.player.id, candidates, self.horizon)
+
+        if not self.search.advance(deadline):
+            return []
+        search, self.search = self.search, None
+        self.next_decision = self.game.time + self.decision_interval
+        best = max(range(len(search.candidates)), key=lambda i: search.scores[i])
+        return self.action_commands(search.candidates[best])
+
+    def candidates(self) -> list[tuple]:
+        player = self.player
+        builds = []
+        for s in sorted(player.frontier, key=lambda s: s.index):
+            for i, tower_type in enumerate(player.tower_types):
+                if s.ask_build_tower(tower_type, player, check_only=True):
+                    builds.append(('build', s.index, i))
+        focuses = []
+        own = list(player.towers.values())
+        for t in self.game.towers.values():
+            if t.player is not player and any(o.ask_set_target(t, check_only=True) for o in own):
+                focuses.append(('focus', t.spot.index))
+        return ([NO_ACTION] + focuses + builds)[:self.max_candidates]
+
+    def action_commands(self, action: tuple) -> list[list[Action]]:
+        # the state may have changed while thinking
+        if action[0] == 'build':
+            spot = self.game.spots[action[1]]
+            tower_type = self.player.tower_types[action[2]]
+            if not spot.ask_build_tower(tower_type, self.player, check_only=True):
+                return []
+            press = [ACTIONS_TOWER[action[2]]]
+        elif action[0] == 'focus':
+            spot = self.game.spots[action[1]]
+            if spot.tower is None or spot.tower.player is self.player:
+                return []
+            press = [Action.ORDER_1, Action.ACCEPT]
+        else:
+            return []
+
+        path = self.pointer_path(spot.index)
+        if path is None:
+            return []
+        commands = []
+        if self.sup_pointer is not None:
+            commands.append([Action.ORDER_2, Action.DECLINE])
+        return commands + [[move] for move in path] + [press]
+
+    def pointer_path(self, target: int) -> Optional[list[Action]]:
+        # shortest sequence of pointer moves, breadth first over the move table
+        moves = self.game.controller_moves.table.tolist()
+        directions = [Action(d) for d in sorted(ControllerMoves.DIRECTIONS, key=ControllerMoves.DIRECTIONS.get)]
+        start = self.pointer.index
+        came_from = {start: None}
+        queue = deque([start])
+        while queue:
+            i = queue.popleft()
+            if i == target:
+                break
+            for d, j in enumerate(moves[i]):
+                if j not in came_from:
+                    came_from[j] = (i, directions[d])
+                    queue.append(j)
+        if target not in came_from:
+            return None
+        path = []
+        i = target
+        while came_from[i] is not None:
+            i, move = came_from[i]
+            path.append(move)
+        return path[::-1]
+
+    def close(self):
+        if self.pool is not None:
+            self.pool.shutdown(cancel_futures=True)
+            self.pool = None
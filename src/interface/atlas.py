@@ -0,0 +1,267 @@
+from typing import Callable
+
+import pygame as pg
+
+from logic import consts
+from logic.towers import LongRangeTower, MiningTower, ShortRangeTower
+
+# Drawing functions of tower symbols by tower class: (surface, center, color).
+# Tower classes without a symbol are drawn as a plain body.
+TOWER_SYMBOLS: dict[type, Callable[[pg.Surface, pg.Vector2, pg.Color], None]] = {}
+# Drawing functions of icon symbols by icon name: (surface, top left corner, color)
+ICON_SYMBOLS: dict[str, Callable[[pg.Surface, pg.Vector2, pg.Color], None]] = {}
+
+PLAYER_COLORS = {
+    1: pg.Color(200, 150, 150),
+    2: pg.Color(150, 150, 200),
+}
+SYMBOL_COLOR = pg.Color(250, 250, 250)
+
+ICON_SIZE = 50
+HP_BAR_SIZE = (40, 10)
+HP_BAR_OFFSET = pg.Vector2(-20, -45)
+
+
+def tower_symbol(tower_type: type):
+    def register(fn):
+        TOWER_SYMBOLS[tower_type] = fn
+        return fn
+    return register
+
+
+def icon_symbol(*names: str):
+    def register(fn):
+        for name in names:
+            ICON_SYMBOLS[name] = fn
+        return fn
+    return register
+
+
+def centered(surface: pg.Surface, pos) -> tuple[float, float]:
+    # where to blit a sprite so that its center is at pos
+    w, h = surface.get_size()
+    return pos[0] - w // 2, pos[1] - h // 2
+
+
+class SpriteAtlas:
+    def __init__(self):
+        self.towers: dict[tuple[type, int], pg.Surface] = {}
+        self.icons: dict[tuple[str, tuple], pg.Surface] = {}
+        self.ranges: dict[tuple[float, int], pg.Surface] = {}
+        # (sprite id, zoom) -> the sprite scaled for the camera
+        self.zoomed: dict[tuple[int, float], pg.Surface] = {}
+
+        for tower_type in TOWER_SYMBOLS:
+            for pid in PLAYER_COLORS:
+                self.tower(tower_type, pid)
+        for name in ICON_SYMBOLS:
+            self.icon(name, SYMBOL_COLOR)
+
+        self.projectile = self.render_circle(pg.Color(250, 250, 100), consts.BULLET_RADIUS)  # yellow
+        self.hp_back = pg.Surface(HP_BAR_SIZE)
+        self.hp_back.fill(pg.Color(250, 0, 0))
+        self.hp_front = pg.Surface(HP_BAR_SIZE)
+        self.hp_front.fill(pg.Color(0, 250, 0))
+
+    @staticmethod
+    def render_circle(color: pg.Color, radius: float, width: int = 0) -> pg.Surface:
+        size = 2 * int(radius) + 2
+        sprite = pg.Surface((size, size), pg.SRCALPHA)
+        pg.draw.circle(sprite, color, (size // 2, size // 2), radius, width)
+        return sprite
+
+    def tower(self, tower_type: type, pid: int) -> pg.Surface:
+        sprite = self.towers.get((tower_type, pid))
+        if sprite is None:
+            sprite = self.render_circle(PLAYER_COLORS[pid], consts.TOWER_RADIUS)
+            symbol = TOWER_SYMBOLS.get(tower_type)
+            if symbol is not None:
+                center = sprite.get_width() // 2
+                symbol(sprite, pg.Vector2(center, center), SYMBOL_COLOR)
+            self.towers[(tower_type, pid)] = sprite
+        return sprite
+
+    def icon(self, name: str, color: pg.Color) -> pg.Surface:
+        key = (name, tuple(color))
+        sprite = self.icons.get(key)
+        if sprite is None:
+            if name not in ICON_SYMBOLS:
+                raise RuntimeError(f"Unknown action name: {name}")
+            sprite = pg.Surface((ICON_SIZE, ICON_SIZE), pg.SRCALPHA)
+            ICON_SYMBOLS[name](sprite, pg.Vector2(0, 0), color)
+            self.icons[key] = sprite
+        return sprite
+
+    def scaled(self, sprite: pg.Surface, zoom: float) -> pg.Surface:
+        # only for sprites the atlas keeps, so their ids stay unique
+        if zoom == 1.0:
+            return sprite
+        key = (id(sprite), zoom)
+        scaled = self.zoomed.get(key)
+        if scaled is None:
+            w, h = sprite.get_size()
+            scaled = pg.transform.smoothscale(sprite, (max(1, round(w * zoom)), max(1, round(h * zoom))))
+            self.zoomed[key] = scaled
+        return scaled
+
+    def attack_range(self, radius: float, pid: int) -> pg.Surface:
+        sprite = self.ranges.get((radius, pid))
+        if sprite is None:
+            sprite = self.render_circle(PLAYER_COLORS[pid], radius, 1)
+            self.ranges[(radius, pid)] = sprite
+        return sprite
+
+
+@tower_symbol(LongRangeTower)
+def draw_long_range(surface: pg.Surface, pos: pg.Vector2, color: pg.Color):
+    pg.draw.line(
+        surface=surface,
+        color=color,
+        start_pos=pos + pg.Vector2(0, 15),
+        end_pos=pos + pg.Vector2(0, -15),
+        width=2,
+    )
+
+
+@tower_symbol(ShortRangeTower)
+def draw_short_range(surface: pg.Surface, pos: pg.Vector2, color: pg.Color):
+    pg.draw.line(
+        surface=surface,
+        color=color,
+        start_pos=pos + pg.Vector2(8, 8),
+        end_pos=pos + pg.Vector2(-8, -8),
+        width=2,
+    )
+    pg.draw.line(
+        surface=surface,
+        color=color,
+        start_pos=pos + pg.Vector2(-8, 8),
+        end_pos=pos + pg.Vector2(8, -8),
+        width=2,
+    )
+
+
+@tower_symbol(MiningTower)
+def draw_mining(surface: pg.Surface, pos: pg.Vector2, color: pg.Color):
+    pg.draw.line(
+        surface=surface,
+        color=color,
+        start_pos=pos + pg.Vector2(0, 8),
+        end_pos=pos + pg.Vector2(0, -8),
+        width=2,
+    )
+    pg.draw.circle(
+        surface=surface,
+        color=color,
+        center=pos,
+        radius=10,
+        width=2,
+    )
+
+
+@icon_symbol('Accept')
+def draw_accept(surface: pg.Surface, pos: pg.Vector2, color: pg.Color):
+    pg.draw.line(
+        surface,
+        color,
+        pos + pg.Vector2(10, 10),
+        pos + pg.Vector2(25, 40),
+        width=2
+    )
+    pg.draw.line(
+        surface,
+        color,
+        pos + pg.Vector2(40, 10),
+        pos + pg.Vector2(25, 40),
+        width=2
+    )
+
+
+@icon_symbol('Decline')
+def draw_decline(surface: pg.Surface, pos: pg.Vector2, color: pg.Color):
+    pg.draw.line(
+        surface,
+        color,
+        pos + pg.Vector2(10, 10),
+        pos + pg.Vector2(40, 40),
+        width=2
+    )
+    pg.draw.line(
+        surface,
+        color,
+        pos + pg.Vector2(40, 10),
+        pos + pg.Vector2(10, 40),
+        width=2
+    )
+
+
+@icon_symbol('Focus', 'Set target')
+def draw_target(surface: pg.Surface, pos: pg.Vector2, color: pg.Color):
+    pg.draw.circle(
+        surface,
+        color,
+        pos + pg.Vector2(25, 25),
+        radius=10,
+        width=1,
+    )
+    pg.draw.line(
+        surface,
+        color,
+        pos + pg.Vector2(25, 10),
+        pos + pg.Vector2(25, 40),
+        width=1
+    )
+    pg.draw.line(
+        surface,
+        color,
+        pos + pg.Vector2(10, 25),
+        pos + pg.Vector2(40, 25),
+        width=1
+    )
+
+
+@icon_symbol('Tower Mining')
+def draw_tower_mining(surface: pg.Surface, pos: pg.Vector2, color: pg.Color):
+    pg.draw.circle(
+        surface,
+        color,
+        pos + pg.Vector2(25, 25),
+        radius=10,
+        width=2,
+    )
+    pg.draw.line(
+        surface,
+        color,
+        pos + pg.Vector2(25, 15),
+        pos + pg.Vector2(25, 35),
+        width=2
+    )
+
+
+@icon_symbol('Tower Long range')
+def draw_tower_long_range(surface: pg.Surface, pos: pg.Vector2, color: pg.Color):
+    pg.draw.line(
+        surface,
+        color,
+        pos + pg.Vector2(25, 10),
+        pos + pg.Vector2(25, 40),
+        width=2
+    )
+
+
+@icon_symbol('Tower Short range')
+def draw_tower_short_range(surface: pg.Surface, pos: pg.Vector2, color: pg.Color):
+    pg.draw.line(
+        surface,
+        color,
+        pos + pg.Vector2(15, 15),
+        pos + pg.Vector2(35, 35),
+        width=2
+    )
+    pg.draw.line(
+        surface,
+        color,
+        pos + pg.Vector2(35, 15),
+        pos + pg.Vector2(15, 35),
+        width=2
+    )
@@ -0,0 +1,141 @@
+import math
+
+import numpy as np
+import pygame as pg
+
+
+class Camera:
+    # Level coordinates -> screen: (pos - offset) * zoom. Starts at the identity, which shows
+    # levels made for the 1000x800 screen as they are.
+    ZOOM_STEP = 2 ** 0.25
+    MAX_ZOOM = 4.0
+    # a followed pointer is kept this far inside the view
+    FOLLOW_MARGIN = 40
+    # level pixels shown around the outermost spots
+    PAD = 50
+
+    def __init__(self, view: pg.Rect, world: pg.Rect):
+        # screen area the board is seen through and the bounds of the level
+        self.view = view
+        self.world = world
+        self.offset = pg.Vector2(0, 0)
+        self.zoom = 1.0
+        # zoomed out far enough to see the whole level, but no further
+        self.min_zoom = min(1.0, view.w / (world.w + 2 * self.PAD), view.h / (world.h + 2 * self.PAD))
+        self.follow = True
+
+    def key(self) -> tuple:
+        return self.offset.x, self.offset.y, self.zoom
+
+    def to_screen(self, pos) -> tuple[float, float]:
+        zoom = self.zoom
+        return (pos[0] - self.offset.x) * zoom, (pos[1] - self.offset.y) * zoom
+
+    def to_world(self, pos) -> tuple[float, float]:
+        zoom = self.zoom
+        return pos[0] / zoom + self.offset.x, pos[1] / zoom + self.offset.y
+
+    def visible(self, margin: float = 0.0) -> tuple[float, float, float, float]:
+        # (left, top, right, bottom) of the level seen through the view, widened by margin screen pixels
+        left, top = self.to_world((self.view.left - margin, self.view.top - margin))
+        right, bottom = self.to_world((self.view.right + margin, self.view.bottom + margin))
+        return left, top, right, bottom
+
+    def pan(self, dx: float, dy: float):
+        # by screen pixels
+        self.offset -= pg.Vector2(dx, dy) / self.zoom
+        self.clamp()
+
+    def zoom_by(self, steps: int, anchor=None):
+        # the level point under anchor stays where it is
+        if anchor is None:
+            anchor = self.view.center
+        zoom = min(self.MAX_ZOOM, max(self.min_zoom, self.zoom * self.ZOOM_STEP ** steps))
+        if abs(zoom - 1.0) < 1e-9:
+            zoom = 1.0
+        fixed = self.to_world(anchor)
+        self.zoom = zoom
+        self.offset = pg.Vector2(fixed) - pg.Vector2(anchor) / zoom
+        self.clamp()
+
+    def reset(self):
+        self.zoom = 1.0
+        self.offset = pg.Vector2(0, 0)
+        self.follow = True
+
+    def follow_points(self, points):
+        # smallest move that brings every point inside the view less the margin, the first point wins
+        m = self.FOLLOW_MARGIN
+        moved = False
+        for pos in reversed(points):
+            x, y = self.to_screen(pos)
+            dx = min(0.0, x - (self.view.left + m)) + max(0.0, x - (self.view.right - m))
+            dy = min(0.0, y - (self.view.top + m)) + max(0.0, y - (self.view.bottom - m))
+            if dx or dy:
+                self.offset += pg.Vector2(dx, dy) / self.zoom
+                moved = True
+        if moved:
+            self.clamp()
+
+    def clamp(self):
+        # a level smaller than the view is centered in it, a larger one covers it up to the margin
+        pad = self.PAD
+        for axis, (low, size, view_low, view_size) in enumerate([
+            (self.world.left, self.world.w, self.view.left, self.view.w),
+            (self.world.top, self.world.h, self.view.top, self.view.h),
+        ]):
+            seen = view_size / self.zoom
+            if size + 2 * pad <= seen:
+                first = low + size / 2 - seen / 2
+            else:
+                first = min(max(self.offset[axis] + view_low / self.zoom, low - pad), low + size + pad - seen)
+            self.offset[axis] = first - view_low / self.zoom
+
+
+class SpatialGrid:
+    # Spots and edges bucketed by square cells of the level, to find what is inside a rectangle.
+    # An edge is kept in the cell of its middle, queries are widened by the longest half edge.
+    def __init__(self, pos: np.ndarray, edges: np.ndarray, cell: float):
+        # pos - (spots, 2) positions, edges - (edges, 2) spot indices
+        self.cell = cell
+        self.spot_cells = self.bucket(pos)
+        if len(edges):
+            ends = pos[edges]
+            middle = ends.mean(axis=1)
+            self.edge_cells = self.bucket(middle)
+            self.edge_reach = float(np.abs(ends[:, 0] - ends[:, 1]).max()) / 2
+        else:
+            self.edge_cells = {}
+            self.edge_reach = 0.0
+
+    def bucket(self, pos: np.ndarray) -> dict[tuple[int, int], np.ndarray]:
+        cells = np.floor(pos / self.cell).astype(np.int64)
+        order = np.lexsort((cells[:, 1], cells[:, 0]))
+        cells = cells[order]
+        starts = np.flatnonzero(np.any(np.diff(cells, axis=0) != 0, axis=1)) + 1
+        bounds = np.concatenate(([0], starts, [len(order)]))
+        return {
+            (int(cells[a, 0]), int(cells[a, 1])): np.sort(order[a:b])
+            for a, b in zip(bounds[:-1], bounds[1:]) if b > a
+        }
+
+    def spots(self, rect: tuple[float, float, float, float]) -> np.ndarray:
+        return self.query(self.spot_cells, rect, 0.0)
+
+    def edges(self, rect: tuple[float, float, float, float]) -> np.ndarray:
+        return self.query(self.edge_cells, rect, self.edge_reach)
+
+    def query(self, cells: dict, rect: tuple[float, float, float, float], reach: float) -> np.ndarray:
+        # sorted indices of the items in the cells the rectangle touches
+        left, top, right, bottom = rect
+        c = self.cell
+        x0, y0 = math.floor((left - reach) / c), math.floor((top - reach) / c)
+        x1, y1 = math.floor((right + reach) / c), math.floor((bottom + reach) / c)
+        if (x1 - x0 + 1) * (y1 - y0 + 1) > len(cells):
+            found = [items for (x, y), items in cells.items() if x0 <= x <= x1 and y0 <= y <= y1]
+        else:
+            found = [items for x in range(x0, x1 + 1) for y in range(y0, y1 + 1)
+                     if (items := cells.get((x, y))) is not None]
+        if not found:
+            return np.zeros(0, dtype=np.int64)
+        return np.sort(np.concatenate(found))
@@ -1,9 +1,10 @@
+import random
 from enum import Enum
 from typing import Optional
 
 import pygame as pg
 
-from logic.game import Game, Player, Spot, Tower
+from logic.game import ControllerMoves, Game, Player, Spot, Tower
 
 
 class Action(Enum):
@@ -24,28 +25,40 @@ class Action(Enum):
     DECLINE = "NOK"
 
 
-class KeyboardController:
-    def __init__(self, screen: pg.Surface, game: Game, player: Player):
-        self.screen = screen
+class Controller:
+    def __init__(self, game: Game, player: Player):
         self.game = game
         self.player = player
 
-        self.moves: dict[(str, Spot), Spot] = game.controller_moves
+        self.moves: ControllerMoves = game.controller_moves
         self.pointer: Spot = self.game.spots[0]
-        self.buttons: dict[int, list[Action]] = BUTTONS_BY_PLAYER[player.id]
 
         self.sup_pointer: Optional[Tower] = None
         self.sup_action_ind: Optional[int] = None
 
+        # gets every applied command, see basics.replay.Recorder
+        self.recorder = None
+
     def handle(self, buttons):
+        self.apply(self.commands(buttons))
+
+    def commands(self, buttons) -> list[list[Action]]:
+        # what the controller does this tick, given the pressed keyboard buttons
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+    def apply(self, commands: list[list[Action]]):
+        if self.recorder is not None and commands:
+            self.recorder.record(self.game.time, self.player.id, commands)
+
         if self.sup_pointer is not None and not self.sup_pointer.is_alive():
             self.sup_pointer = None
             self.sup_action_ind = None
 
-        for b in buttons:
-            if b not in self.buttons:
-                continue
-            for action in self.buttons[b]:
+        for command in commands:
+            for action in command:
                 if action in ACTIONS_MOVE:
                     self.pointer = self.moves[(action.value, self.pointer)]
                 if self.sup_pointer is None:
@@ -68,10 +81,8 @@ class KeyboardController:
                             and self.pointer.tower is not None \
                             and self.pointer.tower.player != self.player \
                             and action == Action.ORDER_1:
-                        for s in self.game.spots:
-                            if s.tower is not None \
-                                    and s.tower.player == self.player:
-                                s.tower.ask_set_target(self.pointer.tower)
+                        for tower in list(self.player.towers.values()):
+                            tower.ask_set_target(self.pointer.tower)
                 else:
                     if action == Action.DECLINE:
                         self.sup_pointer = None
@@ -84,6 +95,40 @@ class KeyboardController:
                         break
 
 
+class KeyboardController(Controller):
+    def __init__(self, screen: pg.Surface, game: Game, player: Player):
+        super().__init__(game, player)
+        self.screen = screen
+        self.buttons: dict[int, list[Action]] = BUTTONS_BY_PLAYER[player.id]
+
+    def commands(self, buttons) -> list[list[Action]]:
+        return [self.buttons[b] for b in buttons if b in self.buttons]
+
+
+class ScriptedController(Controller):
+    # script: game tick -> commands pressed on that tick
+    def __init__(self, game: Game, player: Player, script: dict[int, list[list[Action]]]):
+        super().__init__(game, player)
+        self.script = script
+
+    def commands(self, buttons) -> list[list[Action]]:
+        return self.script.get(self.game.time, [])
+
+
+class RandomController(Controller):
+    # presses random commands, deterministic for the given seed
+    def __init__(self, game: Game, player: Player, seed: int = 0, press_chance: float = 0.1):
+        super().__init__(game, player)
+        self.rng = random.Random(seed)
+        self.press_chance = press_chance
+
+    def commands(self, buttons) -> list[list[Action]]:
+        if self.rng.random() < self.press_chance:
+            return [self.rng.choice(COMMANDS)]
+        else:
+            return []
+
+
 ACTIONS_MOVE = {
     Action.MOVE_UP, Action.MOVE_DOWN, Action.MOVE_LEFT, Action.MOVE_RIGHT
 }
@@ -127,3 +172,42 @@ BUTTONS_P2 = {
 }
 
 BUTTONS_BY_PLAYER = {1: BUTTONS_P1, 2: BUTTONS_P2}
+
+# first button of the player bound to each action
+BUTTON_BY_ACTION = {
+    pid: {action: key for key, actions in reversed(buttons.items()) for action in actions}
+    for pid, buttons in BUTTONS_BY_PLAYER.items()
+}
+
+# Everything a single button press can mean, same for both players
+COMMANDS = [
+    [Action.MOVE_LEFT],
+    [Action.MOVE_RIGHT],
+    [Action.MOVE_UP],
+    [Action.MOVE_DOWN],
+
+    [Action.TOWER_1],
+    [Action.TOWER_2],
+    [Action.TOWER_3],
+
+    [Action.ORDER_1, Action.ACCEPT],
+    [Action.ORDER_2, Action.DECLINE],
+]
+COMMAND_CODES = {tuple(command): code for code, command in enumerate(COMMANDS)}
+
+
+def parse_command(text: str) -> list[Action]:
+    return [Action(value) for value in text.split('+')]
+
+
+def load_script(filename) -> dict[int, dict[int, list[list[Action]]]]:
+    # lines "<tick> <player id> <actions>", e.g. "120 1 O1+OK"
+    scripts = {1: {}, 2: {}}
+    with open(filename) as f:
+        for line in f:
+            line = line.strip()
+            if not line or line[0] == '#':
+                continue
+            tick, pid, command = line.split()
+            scripts[int(pid)].setdefault(int(tick), []).append(parse_command(command))
+    return scripts
@@ -1,11 +1,17 @@
-from typing import List
+from typing import List, Optional
 
+import numpy as np
 import pygame as pg
 
-from logic.game import Game, Spot, Tower, Projectile
-from logic.towers import BaseTower, ShortRangeTower, LongRangeTower, MiningTower
+from logic.game import Game
+from logic.profiling import Profiler
 from interface.control import KeyboardController, Action
 import interface.control as control
+from interface.render_state import RenderState, take_render_state
+from interface.text_cache import TextCache
+from interface.atlas import SpriteAtlas, centered, HP_BAR_OFFSET
+from interface.camera import Camera, SpatialGrid
+from interface.minimap import Minimap
 from logic import consts
 
 
@@ -19,127 +25,164 @@ class Drawer:
         self.big_font = pg.font.SysFont('Comic Sans MS', 30)
         self.small_font = pg.font.SysFont('Comic Sans MS', 15)
 
-    def draw_game(self):
-        self.draw_background()
-
-        self.draw_graph(self.game.spots)
-        self.draw_projectiles(self.game.projectiles)
-        self.draw_towers(self.game.spots)
-
-        self.draw_pointers()
-        self.draw_interface()
-
-        pg.display.flip()
-
-    def draw_background(self):
-        self.screen.fill(pg.Color(150, 200, 150))
+        # background and the visible part of the spot graph, drawn again only when the camera moves
+        self.static_layer: Optional[pg.Surface] = None
+        self.static_key: Optional[tuple] = None
+        # whether the last frame repainted the whole screen
+        self.redrawn = False
+        # screen areas covered by dynamic layers in the last frame
+        self.dirty: list[pg.Rect] = []
+
+        self.text = TextCache()
+        self.atlas = SpriteAtlas()
+        self.box_layer: Optional[pg.Surface] = None
+        # per player: (state the icons were drawn for, rendered panel)
+        self.icon_panels: list[Optional[tuple[tuple, pg.Surface]]] = [None, None]
+
+        # shown over the board when set
+        self.profile_overlay: Optional[Profiler] = None
+
+        # the spot graph never changes during a match
+        pos = np.array([(s.pos.x, s.pos.y) for s in game.spots], dtype=np.float64).reshape(-1, 2)
+        self.edges = np.array(
+            [(s1.index, s2.index) for s1 in game.spots for s2 in s1.neighbours if s1.index < s2.index],
+            dtype=np.int64,
+        ).reshape(-1, 2)
+        self.grid = SpatialGrid(pos, self.edges, self.GRID_CELL)
+        if len(pos):
+            low, high = pos.min(axis=0), pos.max(axis=0)
+            world = pg.Rect(low.tolist(), (high - low).tolist())
+        else:
+            world = self.VIEW.copy()
+        self.camera = Camera(self.VIEW.copy(), world)
+        # only for levels that do not fit the board
+        self.minimap: Optional[Minimap] = \
+            Minimap(pos, world, self.VIEW) if world.w > self.VIEW.w or world.h > self.VIEW.h else None
+
+    def capture_area(self) -> tuple[float, float, float, float]:
+        # a bit around the view, so that the camera can move before the next state
+        return self.camera.visible(self.CAPTURE_MARGIN)
+
+    def capture(self, area: Optional[tuple[float, float, float, float]] = None) -> RenderState:
+        # towers in the area of the level, by default the one around the current view
+        if area is None:
+            area = self.capture_area()
+        spots = self.grid.spots(area).tolist()
+        return take_render_state(self.game, self.controllers, self.profile_overlay, spots)
+
+    def draw_game(self, alpha: float = 1.0, state: Optional[RenderState] = None):
+        changed = self.draw_frame(alpha, state)
+        if self.redrawn:
+            pg.display.flip()
+        else:
+            pg.display.update(changed)
+
+    def draw_frame(self, alpha: float = 1.0, state: Optional[RenderState] = None) -> list[pg.Rect]:
+        # returns the areas of the screen that changed,
+        # alpha is the time since the last tick in ticks, moving things are drawn in between.
+        # Only the state and the spot graph, which never changes, are read; without a state
+        # one is taken from the game.
+        camera = self.camera
+        if state is None:
+            if camera.follow:
+                camera.follow_points([cnt.pointer.pos for cnt in self.controllers])
+            state = self.capture()
+        if camera.follow:
+            camera.follow_points([pointer[1] for pointer in state.pointers])
+        self.redrawn = self.static_key != camera.key()
+        if self.redrawn:
+            self.render_static()
+            self.screen.blit(self.static_layer, (0, 0))
+        else:
+            for rect in self.dirty:
+                self.screen.blit(self.static_layer, rect, rect)
+        erased = self.dirty
+        self.dirty = []
+
+        self.draw_projectiles(state, alpha)
+        self.draw_towers(state)
+
+        self.draw_pointers(state)
+        if self.minimap is not None:
+            self.dirty += self.minimap.draw(self.screen, camera, state)
+        self.draw_interface(state)
+        if state.profile is not None:
+            self.draw_profile(state.profile)
+
+        return erased + self.dirty + self.HUD_RECTS
+
+    def render_static(self):
+        if self.static_layer is None:
+            self.static_layer = pg.Surface(self.screen.get_size(), 0, self.screen)
+        self.draw_background(self.static_layer)
+        self.draw_graph(self.static_layer)
+        self.static_key = self.camera.key()
+
+    def draw_background(self, surface: pg.Surface):
+        surface.fill(pg.Color(150, 200, 150))
+
+    def draw_graph(self, surface: pg.Surface):
+        # only what the camera sees, found through the grid
+        camera = self.camera
+        zoom = camera.zoom
+        visible = camera.visible(consts.TOWER_RADIUS * zoom)
+        spots = self.game.spots
 
-    def draw_graph(self, spots: list[Spot]):
         # draw lines
-        for s1 in spots:
-            for s2 in s1.neighbours:
-                pg.draw.line(
-                    surface=self.screen,
-                    color=pg.Color(200, 200, 200),  # light grey
-                    start_pos=s1.pos,
-                    end_pos=s2.pos,
-                    width=5
-                )
+        width = max(1, round(5 * zoom))
+        for i, j in self.edges[self.grid.edges(visible)].tolist():
+            pg.draw.line(
+                surface=surface,
+                color=pg.Color(200, 200, 200),  # light grey
+                start_pos=camera.to_screen(spots[i].pos),
+                end_pos=camera.to_screen(spots[j].pos),
+                width=width
+            )
 
         # draw spots
-        for s in spots:
+        for i in self.grid.spots(visible).tolist():
             pg.draw.circle(
-                surface=self.screen,
+                surface=surface,
                 color=pg.Color(125, 125, 125),  # grey
-                center=s.pos,
-                radius=consts.TOWER_RADIUS
-            )
-
-    def draw_projectiles(self, projectiles: list[Projectile]):
-        for p in projectiles:
-            pg.draw.circle(
-                surface=self.screen,
-                color=pg.Color(250, 250, 100),  # yellow
-                center=p.pos,
-                radius=5
-            )
-
-    def draw_towers(self, spots: list[Spot]):
-        for s in spots:
-            if s.tower is not None:
-                self.draw_tower(s.tower)
-                self.draw_hp_bar(s.tower)
-
-    def draw_hp_bar(self, tower: Tower):
-        frac = tower.hp / tower.MAX_HP
-        center = tower.spot.pos
-        pg.draw.rect(
-            surface=self.screen,
-            color=pg.Color(250, 0, 0),
-            rect=pg.Rect(center + pg.Vector2(-20, -45), (40, 10))
-        )
-        pg.draw.rect(
-            surface=self.screen,
-            color=pg.Color(0, 250, 0),
-            rect=pg.Rect(center + pg.Vector2(-20, -45), (40 * frac, 10))
-        )
-
-    def draw_tower(self, tower: Tower):
-        pos = tower.spot.pos
-        # Body
-        if tower.player.id == 1:
-            color = pg.Color(200, 150, 150)
-        else:
-            color = pg.Color(150, 150, 200)
-        pg.draw.circle(
-            surface=self.screen,
-            color=color,
-            center=pos,
-            radius=consts.TOWER_RADIUS
-        )
-
-        # Symbol
-        sym_color = pg.Color(250, 250, 250)
-        if type(tower) == LongRangeTower:
-            pg.draw.line(
-                surface=self.screen,
-                color=sym_color,
-                start_pos=pos + pg.Vector2(0, 15),
-                end_pos=pos + pg.Vector2(0, -15),
-                width=2,
-            )
-        elif type(tower) == ShortRangeTower:
-            pg.draw.line(
-                surface=self.screen,
-                color=sym_color,
-                start_pos=pos + pg.Vector2(8, 8),
-                end_pos=pos + pg.Vector2(-8, -8),
-                width=2,
-            )
-            pg.draw.line(
-                surface=self.screen,
-                color=sym_color,
-                start_pos=pos + pg.Vector2(-8, 8),
-                end_pos=pos + pg.Vector2(8, -8),
-                width=2,
-            )
-        elif type(tower) == MiningTower:
-            pg.draw.line(
-                surface=self.screen,
-                color=sym_color,
-                start_pos=pos + pg.Vector2(0, 8),
-                end_pos=pos + pg.Vector2(0, -8),
-                width=2,
-            )
-            pg.draw.circle(
-                surface=self.screen,
-                color=sym_color,
-                center=pos,
-                radius=10,
-                width=2,
+                center=camera.to_screen(spots[i].pos),
+                radius=consts.TOWER_RADIUS * zoom
             )
 
-    def draw_pointers(self):
+    def draw_projectiles(self, state: RenderState, alpha: float = 1.0):
+        camera = self.camera
+        sprite = self.atlas.scaled(self.atlas.projectile, camera.zoom)
+        pos = state.projectile_positions(alpha)
+        left, top, right, bottom = camera.visible(sprite.get_width())
+        pos = pos[(pos[:, 0] >= left) & (pos[:, 0] <= right) & (pos[:, 1] >= top) & (pos[:, 1] <= bottom)]
+        if camera.key() != (0.0, 0.0, 1.0):
+            pos = (pos - (camera.offset.x, camera.offset.y)) * camera.zoom
+        self.dirty += self.screen.blits([
+            (sprite, centered(sprite, p))
+            for p in pos.tolist()
+        ])
+
+    def draw_towers(self, state: RenderState):
+        # body and hp bar of every visible tower in one batch
+        atlas = self.atlas
+        camera = self.camera
+        zoom = camera.zoom
+        hp_back = atlas.scaled(atlas.hp_back, zoom)
+        hp_front = atlas.scaled(atlas.hp_front, zoom)
+        bar_w, bar_h = hp_front.get_size()
+        left, top, right, bottom = camera.visible(-HP_BAR_OFFSET.y * zoom)
+        batch = []
+        for _, tower_type, pid, pos, frac in state.towers:
+            if not (left <= pos[0] <= right and top <= pos[1] <= bottom):
+                continue
+            pos = camera.to_screen(pos)
+            sprite = atlas.scaled(atlas.tower(tower_type, pid), zoom)
+            batch.append((sprite, centered(sprite, pos)))
+            bar_pos = (pos[0] + HP_BAR_OFFSET.x * zoom, pos[1] + HP_BAR_OFFSET.y * zoom)
+            batch.append((hp_back, bar_pos))
+            batch.append((hp_front, bar_pos, pg.Rect(0, 0, bar_w * frac, bar_h)))
+        self.dirty += self.screen.blits(batch)
+
+    def draw_pointers(self, state: RenderState):
         colors = [
             pg.Color(250, 0, 0),  # red
             pg.Color(0, 0, 250),  # blue
@@ -149,148 +192,147 @@ class Drawer:
             pg.Color(0, 0, 200),  # dark blue
         ]
 
+        camera = self.camera
+        zoom = camera.zoom
         for pid in [0, 1]:
-            cnt: KeyboardController = self.controllers[pid]
+            _, pointer_pos, sup = state.pointers[pid]
 
             dr = 0
-            if self.controllers[0].pointer == self.controllers[1].pointer:
+            if state.pointers[0][0] == state.pointers[1][0]:
                 dr = 2*pid
 
-            pg.draw.circle(
+            self.dirty.append(pg.draw.circle(
                 surface=self.screen,
                 color=colors[pid],
-                center=cnt.pointer.pos,
-                radius=consts.TOWER_RADIUS + dr,
+                center=camera.to_screen(pointer_pos),
+                radius=(consts.TOWER_RADIUS + dr) * zoom,
                 width=2
-            )
-            if cnt.sup_pointer is not None:
-                pg.draw.circle(
+            ))
+            if sup is not None:
+                # range of the tower getting the order
+                attack_range, owner, sup_pos = sup
+                sup_pos = camera.to_screen(sup_pos)
+                sprite = self.atlas.attack_range(attack_range * zoom, owner)
+                self.dirty.append(self.screen.blit(sprite, centered(sprite, sup_pos)))
+                self.dirty.append(pg.draw.circle(
                     surface=self.screen,
                     color=sup_colors[pid],
-                    center=cnt.sup_pointer.spot.pos,
-                    radius=consts.TOWER_RADIUS + 5,
+                    center=sup_pos,
+                    radius=(consts.TOWER_RADIUS + 5) * zoom,
                     width=2
-                )
+                ))
 
-    def draw_interface(self):
+    def draw_profile(self, profile: tuple[dict, dict]):
+        times, counters = profile
+        lines = [f"{name:12} {ms:7.3f} ms" for name, ms in times.items()]
+        lines += [f"{name:20} {n:6.2f}" for name, n in counters.items()]
+
+        pos = pg.Vector2(60, 60)
+        for i, line in enumerate(lines):
+            pic = self.text.render(self.small_font, line, pg.Color(0, 0, 0))
+            self.dirty.append(self.screen.blit(pic, pos + pg.Vector2(0, 18 * i)))
+
+    def draw_interface(self, state: RenderState):
         self.draw_box()
-        self.draw_stats()
-        self.draw_icons()
+        self.draw_stats(state)
+        self.draw_icons(state)
+
+    def render_box(self):
+        self.box_layer = pg.Surface(self.screen.get_size(), 0, self.screen)
+        for color, rects in self.BOX_RECTS:
+            for rect in rects:
+                pg.draw.rect(
+                    surface=self.box_layer,
+                    color=color,
+                    rect=rect
+                )
 
     def draw_box(self):
-        # Player 1 half
-        rects1 = [
-            pg.Rect(0, 0, 50, 800),
-            pg.Rect(0, 0, 500, 50),
-            pg.Rect(0, 650, 500, 150)
-        ]
-        # Player 2 half
-        rects2 = [
-            pg.Rect(950, 0, 50, 800),
-            pg.Rect(500, 0, 500, 50),
-            pg.Rect(500, 650, 500, 150)
-        ]
-        # Common (timer)
-        rects3 = [
-            pg.Rect(400, 0, 200, 50)
-        ]
-        for rect in rects1:
-            pg.draw.rect(
-                surface=self.screen,
-                color=pg.Color(150, 50, 50),  # dark red
-                rect=rect
-            )
-        for rect in rects2:
-            pg.draw.rect(
-                surface=self.screen,
-                color=pg.Color(50, 50, 150),  # dark blue
-                rect=rect
-            )
-        for rect in rects3:
-            pg.draw.rect(
-                surface=self.screen,
-                color=pg.Color(200, 200, 100),  # yellow
-                rect=rect
-            )
+        if self.box_layer is None:
+            self.render_box()
+        for rect in self.HUD_RECTS:
+            self.screen.blit(self.box_layer, rect, rect)
+
+    def draw_stats(self, state: RenderState):
+        white = pg.Color(255, 255, 255)
 
-    def draw_stats(self):
         # Player 1 money
-        pic1 = self.big_font.render(
-            "Money " + str(self.game.player_one.money),
-            False,
-            pg.Color(255, 255, 255),  # white
-        )
+        pic1 = self.text.render(self.big_font, "Money " + str(state.money[0]), white)
         self.screen.blit(
             pic1,
             (100, 10),
         )
 
         # Player 2 money
-        pic2 = self.big_font.render(
-            "Money " + str(self.game.player_two.money),
-            False,
-            pg.Color(255, 255, 255),  # white
-        )
+        pic2 = self.text.render(self.big_font, "Money " + str(state.money[1]), white)
         self.screen.blit(pic2, (900 - pic2.get_width(), 10))
 
         # Time
-        time_in_sec = self.game.time // consts.FPS
+        time_in_sec = state.time // state.tick_rate
         sec = time_in_sec % 60
         mins = time_in_sec // 60
         time_str = str(mins) + "m" + str(sec) + "s"
-        pic_time = self.big_font.render(
-            time_str,
-            False,
-            pg.Color(255, 255, 255),  # white
-        )
+        pic_time = self.text.render(self.big_font, time_str, white)
         self.screen.blit(pic_time, (500 - pic_time.get_width() // 2, 10))
 
-    def draw_icons(self):
-        y_start = 670
+    def draw_icons(self, state: RenderState):
+        for pid in [0, 1]:
+            key = state.panels[pid]
+            panel = self.icon_panels[pid]
+            if panel is None or panel[0] != key:
+                panel = (key, self.render_icon_panel(pid, key))
+                self.icon_panels[pid] = panel
+            self.screen.blit(panel[1], (pid * 500 + 50, self.PANEL_Y))
+
+    def render_icon_panel(self, pid: int, key: tuple) -> pg.Surface:
+        # key from render_state.icon_panel_key
+        y_start = 670 - self.PANEL_Y
         x_step = 100
 
-        for pid in [0, 1]:
-            player = self.game.players[pid]
-            x_border = pid * 500 + 50
+        panel = pg.Surface((450, 150), 0, self.screen)
+        panel.fill(self.BOX_RECTS[pid][0])
 
-            cnt: KeyboardController = self.controllers[pid]
-            if cnt.sup_pointer is not None:
-                self.draw_icon(
-                    pg.Vector2(x_border, y_start),
-                    'Accept', Action.ACCEPT, pid,
-                    ['Accept'],
-                )
+        if key[0] == 'sup':
+            self.draw_icon(
+                pg.Vector2(0, y_start),
+                'Accept', Action.ACCEPT, pid,
+                ['Accept'], surface=panel,
+            )
+            self.draw_icon(
+                pg.Vector2(x_step, y_start),
+                'Decline', Action.DECLINE, pid,
+                ['Decline'], surface=panel,
+            )
+        elif key[0] == 'build':
+            _, tower_types, ready = key
+            for i, tower_type in enumerate(tower_types):
+                name: str = tower_type.NAME
                 self.draw_icon(
-                    pg.Vector2(x_border + x_step, y_start),
-                    'Decline', Action.DECLINE, pid,
-                    ['Decline'],
+                    pg.Vector2(i * x_step, y_start),
+                    'Tower ' + name, control.ACTIONS_TOWER[i], pid,
+                    [name, str(tower_type.COST) + ' G'],
+                    is_ready=ready[i], surface=panel,
                 )
-            elif cnt.pointer.tower is None:
-                for i, tower_type in enumerate(player.tower_types):
-                    name: str = tower_type.NAME
-                    self.draw_icon(
-                        pg.Vector2(x_border + i * x_step, y_start),
-                        'Tower ' + name, control.ACTIONS_TOWER[i], pid,
-                        [name, str(tower_type.COST) + ' G']
-                    )
-            elif cnt.pointer.tower.player == player:
-                tower: Tower = cnt.pointer.tower
-                for i, ord_name in enumerate(tower.ORDER_NAMES):
-                    self.draw_icon(
-                        pg.Vector2(x_border + i*x_step, y_start),
-                        ord_name, control.ACTIONS_ORDER[i], pid,
-                        ['Choose', 'target']
-                    )
-            elif cnt.pointer.tower.player != player:
+        elif key[0] == 'orders':
+            for i, ord_name in enumerate(key[1]):
                 self.draw_icon(
-                    pg.Vector2(x_border, y_start),
-                    'Focus', Action.ORDER_1, pid,
-                    ['Focus'],
+                    pg.Vector2(i*x_step, y_start),
+                    ord_name, control.ACTIONS_ORDER[i], pid,
+                    ['Choose', 'target'], surface=panel,
                 )
+        else:
+            self.draw_icon(
+                pg.Vector2(0, y_start),
+                'Focus', Action.ORDER_1, pid,
+                ['Focus'], surface=panel,
+            )
+        return panel
 
     def draw_icon(self, pos: pg.Vector2, sym_name: str, action: Action, pid: int,
-                  description: List[str], is_ready: bool = True):
+                  description: List[str], is_ready: bool = True, surface: Optional[pg.Surface] = None):
         pos = pg.Vector2(pos)
+        if surface is None:
+            surface = self.screen
 
         # fill back
         if is_ready:
@@ -300,17 +342,17 @@ class Drawer:
             draw_color = pg.Color(250, 250, 250)  # white
             fill_color = pg.Color(100, 100, 100)  # dark grey
         pg.draw.rect(
-            self.screen,
+            surface,
             fill_color,
             pg.Rect(pos, (50, 50)),
         )
 
         # icon symbol
-        self.draw_action_sym(pos, sym_name, draw_color)
+        surface.blit(self.atlas.icon(sym_name, draw_color), pos)
 
         # icon frame
         pg.draw.rect(
-            self.screen,
+            surface,
             draw_color,
             pg.Rect(pos, (50, 50)),
             3
@@ -320,118 +362,52 @@ class Drawer:
         button_name = self.BUTTON_NAMES[self.get_action_button(action, pid)]
         full_description = [button_name] + description
         for i, line in enumerate(full_description):
-            text_pic = self.small_font.render(
+            text_pic = self.text.render(
+                self.small_font,
                 full_description[i],
-                False,
                 pg.Color(250, 250, 250)  # white
             )
-            self.screen.blit(
+            surface.blit(
                 text_pic,
                 pg.Rect(pos + pg.Vector2(0, 55 + i*20), (50, 20))
             )
 
     @staticmethod
     def get_action_button(action: Action, pid: int):
-        keys_dict = control.BUTTONS_BY_PLAYER[pid+1]
+        return control.BUTTON_BY_ACTION[pid+1].get(action)
 
-        for key in keys_dict:
-            if action in keys_dict[key]:
-                return key
-
-    def draw_action_sym(self, pos: pg.Vector2, name: str, color: pg.Color):
-        # size = (70, 70)
-        if name == 'Accept':
-            pg.draw.line(
-                self.screen,
-                color,
-                pos + pg.Vector2(10, 10),
-                pos + pg.Vector2(25, 40),
-                width=2
-            )
-            pg.draw.line(
-                self.screen,
-                color,
-                pos + pg.Vector2(40, 10),
-                pos + pg.Vector2(25, 40),
-                width=2
-            )
-        elif name == 'Decline':
-            pg.draw.line(
-                self.screen,
-                color,
-                pos + pg.Vector2(10, 10),
-                pos + pg.Vector2(40, 40),
-                width=2
-            )
-            pg.draw.line(
-                self.screen,
-                color,
-                pos + pg.Vector2(40, 10),
-                pos + pg.Vector2(10, 40),
-                width=2
-            )
-        elif name == 'Focus' or name == 'Set target':
-            pg.draw.circle(
-                self.screen,
-                color,
-                pos + pg.Vector2(25, 25),
-                radius=10,
-                width=1,
-            )
-            pg.draw.line(
-                self.screen,
-                color,
-                pos + pg.Vector2(25, 10),
-                pos + pg.Vector2(25, 40),
-                width=1
-            )
-            pg.draw.line(
-                self.screen,
-                color,
-                pos + pg.Vector2(10, 25),
-                pos + pg.Vector2(40, 25),
-                width=1
-            )
-        elif name == 'Tower Mining':
-            pg.draw.circle(
-                self.screen,
-                color,
-                pos + pg.Vector2(25, 25),
-                radius=10,
-                width=2,
-            )
-            pg.draw.line(
-                self.screen,
-                color,
-                pos + pg.Vector2(25, 15),
-                pos + pg.Vector2(25, 35),
-                width=2
-            )
-        elif name == 'Tower Long range':
-            pg.draw.line(
-                self.screen,
-                color,
-                pos + pg.Vector2(25, 10),
-                pos + pg.Vector2(25, 40),
-                width=2
-            )
-        elif name == 'Tower Short range':
-            pg.draw.line(
-                self.screen,
-                color,
-                pos + pg.Vector2(15, 15),
-                pos + pg.Vector2(35, 35),
-                width=2
-            )
-            pg.draw.line(
-                self.screen,
-                color,
-                pos + pg.Vector2(35, 15),
-                pos + pg.Vector2(15, 35),
-                width=2
-            )
-        else:
-            raise RuntimeError(f"Unknown action name: {name}")
+    # (color, rects) of Player 1 half, Player 2 half and the common timer box
+    BOX_RECTS = [
+        (pg.Color(150, 50, 50), [  # dark red
+            pg.Rect(0, 0, 50, 800),
+            pg.Rect(0, 0, 500, 50),
+            pg.Rect(0, 650, 500, 150)
+        ]),
+        (pg.Color(50, 50, 150), [  # dark blue
+            pg.Rect(950, 0, 50, 800),
+            pg.Rect(500, 0, 500, 50),
+            pg.Rect(500, 650, 500, 150)
+        ]),
+        (pg.Color(200, 200, 100), [  # yellow
+            pg.Rect(400, 0, 200, 50)
+        ]),
+    ]
+    PANEL_Y = 650
+
+    # board area between the interface bands, what the camera shows
+    VIEW = pg.Rect(50, 50, 900, 600)
+    # side of the spatial grid cells in level pixels
+    GRID_CELL = 200
+    # screen pixels around the view the taken states cover
+    CAPTURE_MARGIN = 100
+
+    # interface bands, fully repainted by draw_box every frame
+    HUD_RECTS = [
+        pg.Rect(0, 0, 1000, 50),
+        pg.Rect(0, 650, 1000, 150),
+        pg.Rect(0, 0, 50, 800),
+        pg.Rect(950, 0, 50, 800),
+    ]
 
     BUTTON_NAMES = {
         pg.K_KP0: '0', pg.K_KP1: '1', pg.K_KP2: '2', pg.K_KP3: '3', pg.K_KP4: '4',
@@ -0,0 +1,54 @@
+import numpy as np
+import pygame as pg
+
+from interface.atlas import PLAYER_COLORS
+from interface.camera import Camera
+from interface.render_state import RenderState
+
+
+class Minimap:
+    # Whole level in a corner of the board, one pixel per spot coloured by owner.
+    # Rendered again only when a tower appears or dies, the view frame is drawn over it every frame.
+    SIZE = (160, 120)
+    BACKGROUND = (60, 80, 60)
+    # empty spot, player 1, player 2
+    PALETTE = np.array(
+        [(125, 125, 125)] + [tuple(PLAYER_COLORS[pid])[:3] for pid in sorted(PLAYER_COLORS)], dtype=np.uint8
+    )
+
+    def __init__(self, pos: np.ndarray, world: pg.Rect, view: pg.Rect):
+        self.world = world
+        self.scale = min(self.SIZE[0] / max(world.w, 1), self.SIZE[1] / max(world.h, 1))
+        size = (max(1, int(world.w * self.scale) + 1), max(1, int(world.h * self.scale) + 1))
+        self.rect = pg.Rect((0, 0), size)
+        self.rect.bottomright = (view.right - 10, view.bottom - 10)
+        self.pixels = ((pos - world.topleft) * self.scale).astype(np.int64)
+        np.clip(self.pixels, 0, np.array(size) - 1, out=self.pixels)
+        self.surface = pg.Surface(size)
+        self.ownership = None
+
+    def update(self, state: RenderState):
+        if state.ownership == self.ownership:
+            return
+        self.ownership = state.ownership
+        owner = state.owners
+        # towers are drawn over the empty spots sharing their pixel
+        order = np.argsort(owner, kind='stable')
+        arr = np.empty(self.surface.get_size() + (3,), dtype=np.uint8)
+        arr[:] = self.BACKGROUND
+        px = self.pixels[order]
+        arr[px[:, 0], px[:, 1]] = self.PALETTE[owner[order]]
+        pg.surfarray.blit_array(self.surface, arr)
+
+    def draw(self, screen: pg.Surface, camera: Camera, state: RenderState) -> list[pg.Rect]:
+        self.update(state)
+        screen.blit(self.surface, self.rect)
+        left, top, right, bottom = camera.visible()
+        frame = pg.Rect(
+            self.rect.left + (left - self.world.left) * self.scale,
+            self.rect.top + (top - self.world.top) * self.scale,
+            (right - left) * self.scale, (bottom - top) * self.scale,
+        ).clip(self.rect)
+        if frame.w > 0 and frame.h > 0:
+            pg.draw.rect(screen, pg.Color(250, 250, 250), frame, 1)
+        return [self.rect]
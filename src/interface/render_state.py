@@ -0,0 +1,110 @@
+import threading
+import time
+from typing import Optional
+
+import numpy as np
+
+from interface.control import Controller
+from logic.game import Game, Tower
+from logic.profiling import Profiler
+
+
+class RenderState:
+    # Everything the Drawer shows of one tick, copied out of the game. Never changed after it is made,
+    # so it can be drawn while the game goes on.
+    __slots__ = ('time', 'tick_rate', 'money', 'towers', 'owners', 'ownership', 'prev_projectiles',
+                 'projectiles', 'pointers', 'panels', 'profile')
+
+    def __init__(self, time: int, tick_rate: int, money: tuple, towers: tuple, owners: np.ndarray, ownership: int,
+                 prev_projectiles: np.ndarray, projectiles: np.ndarray, pointers: tuple, panels: tuple,
+                 profile: Optional[tuple[dict, dict]]):
+        self.time = time
+        self.tick_rate = tick_rate
+        # per player
+        self.money: tuple[int, ...] = money
+        # (spot index, tower type, player id, (x, y), hp fraction) in spot order,
+        # only of the spots asked for when taken for a part of the level
+        self.towers: tuple = towers
+        # Game.spot_owners and Game.ownership_changes, the same count means the same owners
+        self.owners = owners
+        self.ownership = ownership
+        # projectile positions at the previous and at this tick
+        self.prev_projectiles = prev_projectiles
+        self.projectiles = projectiles
+        # per controller: (pointer spot index, (x, y), None or (attack range, player id, (x, y)) of the ordered tower)
+        self.pointers: tuple = pointers
+        # per player: what the icon panel shows, see icon_panel_key
+        self.panels: tuple = panels
+        # profiler averages when the overlay is on
+        self.profile = profile
+
+    def projectile_positions(self, alpha: float = 1.0) -> np.ndarray:
+        if alpha == 1.0:
+            return self.projectiles
+        prev = self.prev_projectiles
+        return prev + (self.projectiles - prev) * alpha
+
+
+def take_render_state(game: Game, controllers: tuple[Controller, ...], profiler: Optional[Profiler] = None,
+                      spots: Optional[list[int]] = None) -> RenderState:
+    # towers on the given sorted spot indices, or all of them
+    if spots is None:
+        alive = sorted(game.towers.values(), key=Tower.spot_index)
+    else:
+        game_spots = game.spots
+        alive = [t for i in spots if (t := game_spots[i].tower) is not None]
+    towers = tuple(
+        (t.spot.index, type(t), t.player.id, (t.spot.pos.x, t.spot.pos.y), t.hp / t.stats.max_hp)
+        for t in alive
+    )
+    pointers = []
+    for cnt in controllers:
+        sup = cnt.sup_pointer
+        pointers.append((
+            cnt.pointer.index, (cnt.pointer.pos.x, cnt.pointer.pos.y),
+            (sup.ATTACK_RANGE, sup.player.id, (sup.spot.pos.x, sup.spot.pos.y)) if sup is not None else None,
+        ))
+    store = game.projectiles
+    return RenderState(
+        game.time, game.tick_rate, tuple(p.money for p in game.players), towers,
+        game.spot_owners.copy(), game.ownership_changes,
+        np.array(store.positions(0.0), dtype=np.float64), np.array(store.positions(1.0), dtype=np.float64),
+        tuple(pointers), tuple(icon_panel_key(p, cnt) for p, cnt in zip(game.players, controllers)),
+        profiler.averages() if profiler is not None else None,
+    )
+
+
+def icon_panel_key(player, cnt: Controller) -> tuple:
+    # everything the icons of the player depend on
+    if cnt.sup_pointer is not None:
+        return ('sup',)
+    elif cnt.pointer.tower is None:
+        return (
+            'build',
+            tuple(player.tower_types),
+            tuple(player.money > tower_type.COST for tower_type in player.tower_types),
+        )
+    elif cnt.pointer.tower.player == player:
+        return ('orders', tuple(cnt.pointer.tower.ORDER_NAMES))
+    else:
+        return ('focus',)
+
+
+class RenderBuffer:
+    # Double buffer between the simulation thread, which publishes a state every tick,
+    # and the render thread, which draws the latest one
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.front: Optional[RenderState] = None
+        self.back: Optional[RenderState] = None
+        self.published_at = 0.0
+
+    def publish(self, state: RenderState):
+        with self.lock:
+            self.front, self.back = state, self.front
+            self.published_at = time.perf_counter()
+
+    def latest(self) -> tuple[Optional[RenderState], float]:
+        # the state and seconds since it was published
+        with self.lock:
+            return self.front, time.perf_counter() - self.published_at
@@ -0,0 +1,23 @@
+from collections import OrderedDict
+
+import pygame as pg
+
+
+class TextCache:
+    # rendered text surfaces by (font, string, color), least recently used dropped first
+    def __init__(self, capacity: int = 256):
+        self.capacity = capacity
+        self.surfaces: OrderedDict[tuple, pg.Surface] = OrderedDict()
+
+    def render(self, font: pg.font.Font, text: str, color: pg.Color) -> pg.Surface:
+        key = (font, text, tuple(color))
+        pic = self.surfaces.get(key)
+        if pic is not None:
+            self.surfaces.move_to_end(key)
+            return pic
+
+        pic = font.render(text, False, color)
+        self.surfaces[key] = pic
+        if len(self.surfaces) > self.capacity:
+            self.surfaces.popitem(last=False)
+        return pic
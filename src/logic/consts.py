@@ -1,6 +1,13 @@
+# Simulation ticks per second. Durations here and in tower stats are given
+# in 1/60 s and speeds in px per 1/60 s, Game converts them to its tick rate.
+TICK_RATE = 60
+BASE_TICK_RATE = 60
+# Frames drawn per second at most, 0 for no limit
 FPS = 60
+# Ticks simulated at most between two frames, older lag is dropped
+MAX_CATCH_UP_TICKS = 5
 
-INCOME_PERIOD = FPS
+INCOME_PERIOD = 60
 INCOME_BASIC = 20
 INCOME_PER_TOWER = 1
 
@@ -9,6 +16,11 @@ DELAY_AFTER_TOWER_SPAWN = 0
 
 BUILDING_CD_SHARED = 120
 
+# Auto targeting from per-tower candidate heaps instead of scanning the range.
+# Choosing is O(log k), but every hit updates the heaps of the enemies around,
+# which costs more than the scan with the shipped ranges.
+TARGET_INDEX = False
+
 RANGE_LONG = 150.0
 RANGE_SHORT = 110.0
 
@@ -1,82 +1,269 @@
+import heapq
+from collections.abc import Iterable, MutableMapping
 from enum import Enum
 from typing import Optional, List
-from copy import copy
 
+import numpy as np
 import pygame as pg
 
 from logic import consts
+from logic.projectiles import ProjectileStore, ScheduledProjectileStore
+from logic.ranges import RangeTable, compute_ranges
+from logic.profiling import Profiler
+from logic.scheduler import Scheduler
+from logic.snapshot import Snapshot, take_snapshot, restore_snapshot
 
 
 class Game:
-    def __init__(self):
+    def __init__(self, tick_rate: int = consts.TICK_RATE, scheduled_projectiles: bool = False):
+        self.tick_rate = tick_rate
+        self.tick_scale = tick_rate / consts.BASE_TICK_RATE
+
         self.player_one: Player = Player(self, 1)
         self.player_two: Player = Player(self, 2)
         self.players: List[Player] = [self.player_one, self.player_two]
 
         self.spots: list[Spot] = []
-        self.projectiles: list[Projectile] = []
-
-        self.time_to_income = consts.INCOME_PERIOD
+        # stepped every tick, or hits scheduled when fired
+        self.projectiles: ProjectileStore = \
+            ScheduledProjectileStore(self) if scheduled_projectiles else ProjectileStore(self)
+
+        # live towers by uid
+        self.towers: dict[int, Tower] = dict()
+        self.last_tower_uid = 0
+        # player id owning the tower on every spot, 0 for none, and a count of the changes to it
+        self.spot_owners: np.ndarray = np.zeros(0, dtype=np.int8)
+        self.ownership_changes = 0
+
+        # timers wake towers and pay income, towers that are not woken skip the tick
+        self.scheduler = Scheduler()
+        self.awake: set[Tower] = set()
+        # auto target from candidate heaps, see Tower.candidates
+        self.target_index: bool = consts.TARGET_INDEX
+        # towers hit since the last auto target, the candidate heaps are brought up to date before the next
+        self.damaged: set[Tower] = set()
         self.time = 0
+        self.next_income = 0
+        self.time_to_income = self.ticks(consts.INCOME_PERIOD)
+        self.winner: Optional[Player] = None
+        self.profiler: Optional[Profiler] = None
+        # arrays the game was built from, see basics.load.Level
+        self.level = None
+
+        self.controller_moves: ControllerMoves = ControllerMoves(self.spots, np.zeros((0, 4), dtype=np.int32))
 
-        self.controller_moves: dict[(str, Spot), Spot] = dict()
+        # radius -> for every spot index: {spot in range: squared distance}, nearest first
+        self.range_tables: dict[float, RangeTable] = dict()
+        # tower type -> its stats in ticks of this game
+        self.tower_stats: dict[type, TowerStats] = dict()
 
     def update(self):
-        for s in self.spots:
-            s.update()
-        for p in self.projectiles:
-            p.update()
-        self.player_one.update()
-        self.player_two.update()
-
-        # income
+        prof = self.profiler
+        if prof is not None:
+            t = prof.start()
+
+        # durations set during the tick count from its end
         self.time += 1
-        self.time_to_income -= 1
-        if self.time_to_income == 0:
+        self.scheduler.run(self.time, Scheduler.START)
+        if prof is not None:
+            t = prof.lap('timers', t)
+
+        awake, self.awake = self.awake, set()
+        for tower in sorted(awake, key=Tower.spot_index):
+            if tower.spot.tower is tower:
+                tower.update()
+        if prof is not None:
+            t = prof.lap('towers', t)
+
+        self.projectiles.update()
+        if prof is not None:
+            t = prof.lap('projectiles', t)
+
+        self.scheduler.run(self.time, Scheduler.END)
+        if prof is not None:
+            prof.lap('income', t)
+
+    def snapshot(self) -> Snapshot:
+        return take_snapshot(self)
+
+    def restore(self, snap: Snapshot):
+        self.scheduler.clear()
+        restore_snapshot(self, snap)
+        self.damaged.clear()
+        self.ownership_changes += 1
+        self.spot_owners.fill(0)
+        for player in self.players:
+            player.clear_towers()
+        for tower in self.towers.values():
+            tower.candidates = None
+            tower.player.add_tower(tower)
+            self.spot_owners[tower.spot.index] = tower.player.id
+        self.projectiles.reschedule()
+        self.awake = set(self.towers.values())
+
+    @property
+    def time_to_income(self) -> int:
+        return self.next_income - self.time
+
+    @time_to_income.setter
+    def time_to_income(self, value: int):
+        self.next_income = self.time + value
+        self.scheduler.schedule(self.next_income, self.pay_income, self.next_income, phase=Scheduler.END)
+
+    def pay_income(self, tick: int):
+        if tick == self.next_income:
             self.income_frame()
-            self.time_to_income = consts.INCOME_PERIOD
+            self.time_to_income = self.ticks(consts.INCOME_PERIOD)
+
+    def wake_at(self, tower: 'Tower', tick: int):
+        self.scheduler.schedule(tick, self.wake_ready, tower, tick)
+
+    def wake_ready(self, tower: 'Tower', tick: int):
+        # the cooldown may have been restarted since
+        if tower.ready_at == tick:
+            self.awake.add(tower)
+
+    def wake_near(self, spot: 'Spot', idle_only: bool = False, target: Optional['Tower'] = None):
+        for s in self.nearby(spot):
+            tower = s.tower
+            if tower is not None and (not idle_only or tower.target is None) \
+                    and (target is None or tower.target is target):
+                self.awake.add(tower)
+
+    def nearby(self, spot: 'Spot') -> dict['Spot', float]:
+        # spots of all towers that may have this spot in range
+        if not self.range_tables:
+            return {}
+        return self.range_tables[max(self.range_tables)][spot.index]
+
+    def index_damaged(self):
+        for tower in self.damaged:
+            if tower.hp > 0:
+                self.index_target(tower)
+        self.damaged.clear()
+
+    def index_target(self, tower: 'Tower'):
+        # new priority of the tower for the enemies that keep a candidate heap with it
+        for s in self.nearby(tower.spot):
+            enemy = s.tower
+            if enemy is not None and enemy.candidates is not None and enemy.player is not tower.player:
+                enemy.add_candidate(tower)
+
+    def ticks(self, duration: int) -> int:
+        # duration in 1/60 s -> ticks of this game
+        return round(duration * self.tick_scale)
+
+    def opponent(self, player: 'Player') -> 'Player':
+        return self.player_two if player is self.player_one else self.player_one
+
+    def spots_in_range(self, spot: 'Spot', radius: float) -> dict['Spot', float]:
+        table = self.range_tables.get(radius)
+        if table is None:
+            table = self.build_range_table(radius)
+        return table[spot.index]
+
+    def build_range_table(self, radius: float) -> RangeTable:
+        pos = np.array([(s.pos.x, s.pos.y) for s in self.spots], dtype=np.float64).reshape(-1, 2)
+        table = RangeTable(self.spots, *compute_ranges(pos, radius))
+        self.range_tables[radius] = table
+        return table
+
+    def stats(self, tower_type) -> 'TowerStats':
+        stats = self.tower_stats.get(tower_type)
+        if stats is None:
+            stats = TowerStats(self, tower_type)
+            self.tower_stats[tower_type] = stats
+        return stats
 
     def income_frame(self):
-        self.player_one.money += consts.INCOME_BASIC
-        self.player_two.money += consts.INCOME_BASIC
-
-        for spot in self.spots:
-            if spot.tower is not None:
-                spot.tower.player.money += consts.INCOME_PER_TOWER
-                spot.tower.income_frame()
+        for player in self.players:
+            player.money += consts.INCOME_BASIC + player.income
+
+    def register_tower(self, tower: 'Tower'):
+        self.towers[tower.uid] = tower
+        self.spot_owners[tower.spot.index] = tower.player.id
+        self.ownership_changes += 1
+        for player in self.players:
+            player.frontier.discard(tower.spot)
+        tower.player.add_tower(tower)
+
+    def unregister_tower(self, tower: 'Tower'):
+        del self.towers[tower.uid]
+        self.spot_owners[tower.spot.index] = 0
+        self.ownership_changes += 1
+        tower.player.remove_tower(tower)
+        # the spot is free again for whoever borders it
+        for player in self.players:
+            if tower.spot in player.adjacent:
+                player.frontier.add(tower.spot)
+
+
+class TowerStats:
+    # stats of a tower type resolved once per game, durations in ticks
+    __slots__ = ('max_hp', 'attack_damage', 'attack_cd', 'projectile_speed', 'building_time', 'building_cd',
+                 'income')
+
+    def __init__(self, game: Game, tower_type):
+        self.max_hp: int = tower_type.MAX_HP
+        self.attack_damage: Optional[int] = tower_type.ATTACK_DAMAGE
+        self.attack_cd: Optional[int] = \
+            game.ticks(tower_type.ATTACK_CD) if tower_type.ATTACK_CD is not None else None
+        self.projectile_speed: Optional[float] = \
+            tower_type.PROJECTILE_SPEED / game.tick_scale if tower_type.PROJECTILE_SPEED is not None else None
+        self.building_time: int = game.ticks(tower_type.BUILDING_TIME)
+        self.building_cd: int = game.ticks(tower_type.BUILDING_CD)
+        # money the owner gets every income period
+        self.income: int = consts.INCOME_PER_TOWER + tower_type.INCOME
+
+
+class ControllerMoves:
+    # (direction, spot) -> spot the pointer moves to, backed by a (spots, 4) index table
+    __slots__ = ('spots', 'table')
+    DIRECTIONS = {'L': 0, 'R': 1, 'U': 2, 'D': 3}
+
+    def __init__(self, spots: list['Spot'], table: np.ndarray):
+        self.spots = spots
+        self.table = table
+
+    def __getitem__(self, key: tuple[str, 'Spot']) -> 'Spot':
+        direction, spot = key
+        return self.spots[int(self.table[spot.index, self.DIRECTIONS[direction]])]
 
 
 class Spot:
+    __slots__ = ('game', 'index', 'pos', 'neighbours', 'tower', 'ban_until', '_banned_player')
+
     def __init__(self, game: Game):
         self.game = game
+        self.index: int = 0
         self.pos: pg.Vector2 = pg.Vector2(0.0, 0.0)
         self.neighbours: list[Spot] = []
 
         self.tower: Optional[Tower] = None
-        self.ban_time: int = 0
-        self.banned_player: Optional[Player] = None
+        # player ban lasts while game.time < ban_until
+        self.ban_until: int = 0
+        self._banned_player: Optional[Player] = None
 
-    def update(self):
-        # player ban
-        if self.banned_player is not None:
-            self.ban_time -= 1
-        if self.ban_time <= 0:
-            self.banned_player = None
+    @property
+    def banned_player(self) -> Optional['Player']:
+        return self._banned_player if self.game.time < self.ban_until else None
 
-        if self.tower is not None:
-            self.tower.update()
+    @banned_player.setter
+    def banned_player(self, player: Optional['Player']):
+        self._banned_player = player
 
-    def ask_build_tower(self, tower_type, player: 'Player', check_only=False):
-        is_connected = False
-        for nei in self.neighbours:
-            if nei.tower is not None and nei.tower.player == player:
-                is_connected = True
-                break
+    @property
+    def ban_time(self) -> int:
+        return max(0, self.ban_until - self.game.time) if self._banned_player is not None else 0
+
+    @ban_time.setter
+    def ban_time(self, value: int):
+        self.ban_until = self.game.time + value
 
+    def ask_build_tower(self, tower_type, player: 'Player', check_only=False):
         if self.banned_player != player \
                 and player.money > tower_type.COST \
-                and self.tower is None \
-                and is_connected \
+                and self in player.frontier \
                 and player.building_cds[tower_type] == 0:
             if check_only:
                 return True
@@ -92,65 +279,99 @@ class Spot:
         tower = self.create_tower(tower_type, player)
 
         player.money -= tower_type.COST
-        tower.attack_cd = tower.BUILDING_TIME
+        game = self.game
+        tower.attack_cd = tower.stats.building_time
 
         # updating player cds
         for t in player.tower_types:
             player.building_cds[t] = \
-                max(consts.BUILDING_CD_SHARED, player.building_cds[t])
-        player.building_cds[tower_type] = tower.BUILDING_CD
+                max(game.ticks(consts.BUILDING_CD_SHARED), player.building_cds[t])
+        player.building_cds[tower_type] = tower.stats.building_cd
 
         return tower
 
     def create_tower(self, tower_type, player: 'Player'):
         tower: Tower = tower_type(self.game, self, player)
         self.tower = tower
+        self.game.register_tower(tower)
+        # enemies with nothing in range may have got a target
+        self.game.wake_near(self, idle_only=True)
+        if self.game.target_index:
+            self.game.index_target(tower)
+        self.game.awake.add(tower)
         return tower
 
 
 class Tower:
+    __slots__ = ('game', 'spot', 'player', 'uid', 'hp', 'target', 'ready_at', 'spots_in_range', 'stats', 'candidates')
+
     def __init__(self, game: Game, spot: Spot, player: 'Player'):
         self.game = game
         self.spot: Spot = spot
         self.player: Player = player
 
-        self.hp: int = self.MAX_HP
+        game.last_tower_uid += 1
+        self.uid: int = game.last_tower_uid
+
+        self.stats: TowerStats = game.stats(type(self))
+        self.hp: int = self.stats.max_hp
         self.target: Optional[Tower] = None
-        self.attack_cd: int = 0
+        # can shoot from this tick on
+        self.ready_at: int = game.time
 
-    def update(self):
-        self.attack_cd -= 1
-        self.attack_cd = max(0, self.attack_cd)
+        self.spots_in_range: dict[Spot, float] = \
+            game.spots_in_range(spot, self.ATTACK_RANGE) if self.ATTACK_RANGE is not None else {}
+        # heap of (hp fraction, squared distance, spot index, uid, hp) of enemies in range, built on the
+        # first auto target; entries whose tower died or has other hp are dropped when they reach the top
+        self.candidates: Optional[list[tuple]] = None
+
+    @property
+    def attack_cd(self) -> int:
+        return max(0, self.ready_at - self.game.time)
 
+    @attack_cd.setter
+    def attack_cd(self, value: int):
+        self.ready_at = self.game.time + value
+        self.game.wake_at(self, self.ready_at)
+
+    def spot_index(self) -> int:
+        return self.spot.index
+
+    def update(self):
         self.update_target()
 
         if self.target is not None:
             self.try_shoot(self.target)
 
     def try_shoot(self, target: 'Tower'):
-        if (target.spot.pos - self.spot.pos).length() < self.ATTACK_RANGE \
-                and self.attack_cd == 0:
+        if self.attack_cd == 0 and target.spot in self.spots_in_range:
             self.shoot(target)
             return True
         else:
             return False
 
     def shoot(self, target: 'Tower'):
-        projectile = Projectile(target, self, self.ATTACK_DAMAGE, self.PROJECTILE_SPEED)
-        self.game.projectiles.append(projectile)
-        self.attack_cd = self.ATTACK_CD
+        game = self.game
+        stats = self.stats
+        game.projectiles.add(self, target, stats.attack_damage, stats.projectile_speed)
+        if game.profiler is not None:
+            game.profiler.count('projectiles_spawned')
+        self.attack_cd = stats.attack_cd
 
     def take_damage(self, dmg: int):
         self.hp -= dmg
         if self.hp <= 0:
             self.die()
+        elif self.game.target_index:
+            self.game.damaged.add(self)
 
     def ask_set_target(self, target: Optional['Tower'], check_only=False):
         if target is not None \
                 and target.player != self.player \
-                and (self.spot.pos - target.spot.pos).length() < self.ATTACK_RANGE:
+                and target.spot in self.spots_in_range:
             if not check_only:
                 self.target = target
+                self.game.awake.add(self)
             return True
         else:
             return False
@@ -162,24 +383,72 @@ class Tower:
 
         # auto attack
         if self.target is None:
-            cands = list(filter(
-                lambda s:
-                    s.tower is not None and
-                    s.tower.player != self.player and
-                    (s.pos - self.spot.pos).length() < self.ATTACK_RANGE,
-                self.game.spots
-            ))
+            prof = self.game.profiler
+            if prof is not None:
+                prof.count('retargets')
             # choose the most damaged target, if equal - the nearest
-            cands.sort(key=lambda s: (s.pos - self.spot.pos).length())
-            cands.sort(key=lambda s: s.tower.hp / s.tower.MAX_HP)
-            if len(cands) > 0:
-                self.ask_set_target(cands[0].tower)
+            if self.game.target_index:
+                self.target = self.best_candidate()
+                return
+            best = None
+            best_key = None
+            for s, dist_sq in self.spots_in_range.items():
+                tower = s.tower
+                if tower is not None and tower.player != self.player:
+                    key = (tower.hp / tower.stats.max_hp, dist_sq)
+                    if best is None or key < best_key:
+                        best = tower
+                        best_key = key
+            if best is not None:
+                self.target = best
+
+    def best_candidate(self) -> Optional['Tower']:
+        if self.game.damaged:
+            self.game.index_damaged()
+        heap = self.candidates
+        if heap is None:
+            heap = self.build_candidates()
+        towers = self.game.towers
+        while heap:
+            uid, hp = heap[0][3:]
+            best = towers.get(uid)
+            if best is not None and best.hp == hp:
+                return best
+            heapq.heappop(heap)
+        return None
+
+    def build_candidates(self) -> list[tuple]:
+        heap = []
+        for s, dist_sq in self.spots_in_range.items():
+            tower = s.tower
+            if tower is not None and tower.player != self.player:
+                heap.append((tower.hp / tower.stats.max_hp, dist_sq, s.index, tower.uid, tower.hp))
+        heapq.heapify(heap)
+        self.candidates = heap
+        return heap
+
+    def add_candidate(self, tower: 'Tower'):
+        dist_sq = self.spots_in_range.get(tower.spot)
+        if dist_sq is None:
+            return
+        heap = self.candidates
+        heapq.heappush(heap, (tower.hp / tower.stats.max_hp, dist_sq, tower.spot.index, tower.uid, tower.hp))
+        if len(heap) > 2 * len(self.spots_in_range) + 8:
+            # mostly outdated entries
+            towers = self.game.towers
+            heap[:] = [e for e in heap if (t := towers.get(e[3])) is not None and t.hp == e[4]]
+            heapq.heapify(heap)
 
     def die(self):
         spot = self.spot
         spot.tower = None
+        self.game.unregister_tower(self)
+        if self.game.profiler is not None:
+            self.game.profiler.count('towers_died')
         spot.banned_player = self.player
-        spot.ban_time = consts.DELAY_AFTER_TOWER_DEATH
+        spot.ban_time = self.game.ticks(consts.DELAY_AFTER_TOWER_DEATH)
+        # towers shooting at it pick another target next tick
+        self.game.wake_near(spot, target=self)
 
     def is_alive(self):
         return self.hp > 0
@@ -204,9 +473,6 @@ class Tower:
             else:
                 raise ValueError(f"Unexpected number of order for standart tower: {act}")
 
-    def income_frame(self):
-        pass
-
     @property
     def MAX_HP(self):
         raise NotImplementedError
@@ -244,37 +510,12 @@ class Tower:
         raise NotImplementedError
 
     ORDER_NAMES = ['Set target']
-
-
-class Projectile:
-    def __init__(self, target: Tower, sender: Tower, damage: int, speed: float):
-        self.target = target
-        self.sender = sender
-        self.damage = damage
-        self.speed = speed
-
-        self.pos = copy(sender.spot.pos)
-        self.target_pos = copy(target.spot.pos)
-        self.effects = []
-        self.game = target.game
-
-    def collide(self):
-        if self.target.hp > 0:
-            self.target.take_damage(self.damage)
-        self.game.projectiles.remove(self)
-
-    def update(self):
-        try:
-            dir = (self.target_pos - self.pos).normalize()
-            self.pos += dir * self.speed
-
-            if (self.target_pos - self.pos).length() < consts.COLLIDE_DIST:
-                self.collide()
-        except ValueError:
-            self.collide()
+    INCOME = 0
 
 
 class Player:
+    __slots__ = ('id', 'game', 'tower_types', 'building_cds', 'money', 'towers', 'income', 'adjacent', 'frontier')
+
     def __init__(self, game: Game, player_id: int):
         assert player_id == 1 or player_id == 2
         self.id = player_id
@@ -282,15 +523,76 @@ class Player:
 
         self.tower_types: list = []
 
-        self.building_cds: dict = {}
+        self.building_cds: Cooldowns = Cooldowns(game)
         self.money = 0
 
+        # own live towers by uid and the money they bring every income period
+        self.towers: dict[int, Tower] = dict()
+        self.income = 0
+        # spot -> number of own towers next to it; free spots next to an own tower can be built on
+        self.adjacent: dict[Spot, int] = dict()
+        self.frontier: set[Spot] = set()
+
+    def add_tower(self, tower: Tower):
+        self.towers[tower.uid] = tower
+        self.income += tower.stats.income
+        adjacent = self.adjacent
+        for nei in tower.spot.neighbours:
+            adjacent[nei] = adjacent.get(nei, 0) + 1
+            if nei.tower is None:
+                self.frontier.add(nei)
+
+    def remove_tower(self, tower: Tower):
+        del self.towers[tower.uid]
+        self.income -= tower.stats.income
+        adjacent = self.adjacent
+        for nei in tower.spot.neighbours:
+            if adjacent[nei] == 1:
+                del adjacent[nei]
+                self.frontier.discard(nei)
+            else:
+                adjacent[nei] -= 1
+
+    def clear_towers(self):
+        self.towers.clear()
+        self.income = 0
+        self.adjacent.clear()
+        self.frontier.clear()
+
     def set_tower_types(self, tower_types: list):
         self.tower_types = tower_types
         for tt in tower_types:
             self.building_cds[tt] = 0
 
-    def update(self):
-        for t in self.building_cds:
-            if self.building_cds[t] > 0:
-                self.building_cds[t] -= 1
+
+class Cooldowns(MutableMapping):
+    # key -> ticks left, stored as the tick it ends on so nothing counts down
+    __slots__ = ('game', 'ends')
+
+    def __init__(self, game: Game, cds: Iterable[tuple] = ()):
+        self.game = game
+        self.ends: dict = {}
+        for key, value in cds:
+            self[key] = value
+
+    def __getitem__(self, key) -> int:
+        return max(0, self.ends[key] - self.game.time)
+
+    def __setitem__(self, key, value: int):
+        self.ends[key] = self.game.time + value
+
+    def __delitem__(self, key):
+        del self.ends[key]
+
+    def clear(self):
+        self.ends.clear()
+
+    def items(self):
+        time = self.game.time
+        return [(key, max(0, end - time)) for key, end in self.ends.items()]
+
+    def __iter__(self):
+        return iter(self.ends)
+
+    def __len__(self):
+        return len(self.ends)
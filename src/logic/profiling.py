@@ -0,0 +1,61 @@
+import csv
+import time
+from collections import deque
+
+
+class Profiler:
+    # Per-tick phase times and hot path event counts.
+    # Instrumented code keeps `if profiler is not None` checks, so it costs nothing when off.
+    SESSION_PHASES = ['controls', 'update', 'draw', 'wait']
+    UPDATE_PHASES = ['timers', 'towers', 'projectiles', 'income']
+    COUNTERS = ['retargets', 'projectiles_spawned', 'towers_died']
+
+    def __init__(self, csv_file: str = None, history: int = 60):
+        self.times = dict.fromkeys(self.SESSION_PHASES + self.UPDATE_PHASES, 0.0)
+        self.counters = dict.fromkeys(self.COUNTERS, 0)
+        # last ticks as (tick, times, counters), for the overlay
+        self.history: deque[tuple[int, dict, dict]] = deque(maxlen=history)
+
+        self.csv_file = None
+        self.writer = None
+        if csv_file is not None:
+            self.csv_file = open(csv_file, 'w', newline='')
+            self.writer = csv.writer(self.csv_file)
+            self.writer.writerow(
+                ['tick'] + [p + '_ms' for p in self.SESSION_PHASES + self.UPDATE_PHASES] + self.COUNTERS
+            )
+
+    @staticmethod
+    def start() -> float:
+        return time.perf_counter()
+
+    def lap(self, phase: str, start: float) -> float:
+        now = time.perf_counter()
+        self.times[phase] += now - start
+        return now
+
+    def count(self, counter: str, n: int = 1):
+        self.counters[counter] += n
+
+    def end_tick(self, tick: int):
+        times, counters = self.times, self.counters
+        self.history.append((tick, times, counters))
+        if self.writer is not None:
+            self.writer.writerow(
+                [tick] + [round(t * 1000, 4) for t in times.values()] + list(counters.values())
+            )
+        self.times = dict.fromkeys(times, 0.0)
+        self.counters = dict.fromkeys(counters, 0)
+
+    def averages(self) -> tuple[dict, dict]:
+        # mean phase times (ms) and counts per tick over the history
+        n = max(len(self.history), 1)
+        times = {p: sum(h[1][p] for h in self.history) * 1000 / n for p in self.times}
+        counters = {c: sum(h[2][c] for h in self.history) / n for c in self.counters}
+        return times, counters
+
+    def close(self):
+        if self.csv_file is not None:
+            self.csv_file.close()
+            self.csv_file = None
+            self.writer = None
@@ -0,0 +1,221 @@
+import math
+from typing import Optional
+
+import numpy as np
+
+from logic import consts
+from logic.scheduler import Scheduler
+
+
+class ProjectileStore:
+    # Structure of arrays, one row per flying projectile.
+    # Targets and senders are referenced by tower uid (see Game.towers).
+    # column -> (shape of a row, dtype)
+    COLUMNS = {
+        'pos': ((2,), np.float64),
+        # position before the last update, for drawing between ticks
+        'prev_pos': ((2,), np.float64),
+        'target_pos': ((2,), np.float64),
+        'speed': ((), np.float64),
+        'damage': ((), np.int32),
+        'target_id': ((), np.int32),
+        'sender_id': ((), np.int32),
+    }
+
+    def __init__(self, game, capacity: int = 64):
+        self.game = game
+        self.count = 0
+        for name, (shape, dtype) in self.COLUMNS.items():
+            setattr(self, name, np.zeros((capacity,) + shape, dtype=dtype))
+
+    def __len__(self):
+        return self.count
+
+    def columns(self) -> list[np.ndarray]:
+        return [getattr(self, name) for name in self.COLUMNS]
+
+    def reserve(self, capacity: int):
+        if capacity <= len(self.speed):
+            return
+        capacity = max(capacity, 2 * len(self.speed))
+        for name in self.COLUMNS:
+            old = getattr(self, name)
+            new = np.zeros((capacity,) + old.shape[1:], dtype=old.dtype)
+            new[:self.count] = old[:self.count]
+            setattr(self, name, new)
+
+    def add(self, sender, target, damage: int, speed: float):
+        if self.count == len(self.speed):
+            self.reserve(self.count + 1)
+        i = self.count
+        self.pos[i] = sender.spot.pos
+        self.prev_pos[i] = sender.spot.pos
+        self.target_pos[i] = target.spot.pos
+        self.speed[i] = speed
+        self.damage[i] = damage
+        self.target_id[i] = target.uid
+        self.sender_id[i] = sender.uid
+        self.count += 1
+
+    def reschedule(self):
+        # after a restore, nothing to do for stepped projectiles
+        pass
+
+    def update(self):
+        n = self.count
+        if n == 0:
+            return
+
+        pos = self.pos[:n]
+        self.prev_pos[:n] = pos
+        delta = self.target_pos[:n] - pos
+        dist = np.sqrt(delta[:, 0] * delta[:, 0] + delta[:, 1] * delta[:, 1])
+
+        # projectile standing on its target collides without moving
+        moving = dist > 0
+        step = delta[moving] / dist[moving, None] * self.speed[:n][moving, None]
+        pos[moving] += step
+
+        delta = self.target_pos[:n] - pos
+        dist = np.sqrt(delta[:, 0] * delta[:, 0] + delta[:, 1] * delta[:, 1])
+        hit = ~moving | (dist < consts.COLLIDE_DIST)
+        if not hit.any():
+            return
+
+        # damage in firing order
+        towers = self.game.towers
+        for target_id, damage in zip(self.target_id[:n][hit].tolist(), self.damage[:n][hit].tolist()):
+            target = towers.get(target_id)
+            if target is not None and target.hp > 0:
+                target.take_damage(damage)
+
+        self.compact(~hit)
+
+    def positions(self, alpha: float = 1.0) -> np.ndarray:
+        # alpha = 0 at the previous tick, 1 at the current one
+        n = self.count
+        if alpha == 1.0:
+            return self.pos[:n]
+        prev = self.prev_pos[:n]
+        return prev + (self.pos[:n] - prev) * alpha
+
+    def compact(self, keep: np.ndarray):
+        n = self.count
+        k = int(keep.sum())
+        for col in self.columns():
+            col[:k] = col[:n][keep]
+        self.count = k
+
+    def clear(self):
+        self.count = 0
+
+
+NEVER = np.iinfo(np.int64).max
+
+
+def impact_steps(origin, target, speed: float) -> Optional[int]:
+    # number of ProjectileStore updates until the projectile hits, None if it never does
+    ox, oy = origin
+    tx, ty = target
+    dx = tx - ox
+    dy = ty - oy
+    dist = math.sqrt(dx * dx + dy * dy)
+    if dist == 0:
+        return 1
+    if speed < consts.COLLIDE_DIST:
+        # straight approach, it can't step over the collision circle
+        steps = (dist - consts.COLLIDE_DIST) / speed
+        k = max(1, math.floor(steps) + 1)
+        if k == 1 or abs(steps - round(steps)) * speed > 1e-6:
+            return k
+
+    # close to a boundary, step the same float operations as ProjectileStore.update
+    x, y = ox, oy
+    for k in range(1, 2 * math.ceil(dist / speed) + 2):
+        dx = tx - x
+        dy = ty - y
+        d = math.sqrt(dx * dx + dy * dy)
+        if d == 0:
+            return k
+        x += dx / d * speed
+        y += dy / d * speed
+        dx = tx - x
+        dy = ty - y
+        if math.sqrt(dx * dx + dy * dy) < consts.COLLIDE_DIST:
+            return k
+    return None
+
+
+class ScheduledProjectileStore(ProjectileStore):
+    # Projectiles fly straight at a constant speed, so the tick of the hit is known when they are fired.
+    # Damage is a scheduler event, rows are only kept for drawing and snapshots.
+    # Gives the same results as the stepped ProjectileStore.
+    COLUMNS = {
+        'origin': ((2,), np.float64),
+        'target_pos': ((2,), np.float64),
+        'speed': ((), np.float64),
+        'damage': ((), np.int32),
+        'target_id': ((), np.int32),
+        'sender_id': ((), np.int32),
+        'fire_tick': ((), np.int64),
+        'hit_tick': ((), np.int64),
+    }
+
+    def __init__(self, game, capacity: int = 64):
+        super().__init__(game, capacity)
+        self.landed = False
+
+    def add(self, sender, target, damage: int, speed: float):
+        if self.count == len(self.speed):
+            self.reserve(self.count + 1)
+        i = self.count
+        origin = sender.spot.pos
+        target_pos = target.spot.pos
+        self.origin[i] = origin
+        self.target_pos[i] = target_pos
+        self.speed[i] = speed
+        self.damage[i] = damage
+        self.target_id[i] = target.uid
+        self.sender_id[i] = sender.uid
+        # fired during the towers update, the first step is in the same tick
+        time = self.game.time
+        self.fire_tick[i] = time
+        steps = impact_steps((origin.x, origin.y), (target_pos.x, target_pos.y), speed)
+        self.hit_tick[i] = time + steps - 1 if steps is not None else NEVER
+        self.count += 1
+        if steps is not None:
+            self.schedule_hit(i)
+
+    def schedule_hit(self, i: int):
+        self.game.scheduler.schedule(
+            int(self.hit_tick[i]), self.hit, int(self.target_id[i]), int(self.damage[i]), phase=Scheduler.PROJECTILES
+        )
+
+    def hit(self, target_id: int, damage: int):
+        self.landed = True
+        target = self.game.towers.get(target_id)
+        if target is not None and target.hp > 0:
+            target.take_damage(damage)
+
+    def update(self):
+        self.game.scheduler.run(self.game.time, Scheduler.PROJECTILES)
+        if self.landed:
+            self.landed = False
+            self.compact(self.hit_tick[:self.count] > self.game.time)
+
+    def reschedule(self):
+        for i in range(self.count):
+            if self.hit_tick[i] != NEVER:
+                self.schedule_hit(i)
+
+    def positions(self, alpha: float = 1.0) -> np.ndarray:
+        # where the stepped model would draw them
+        n = self.count
+        if n == 0:
+            return np.zeros((0, 2))
+        origin = self.origin[:n]
+        delta = self.target_pos[:n] - origin
+        dist = np.sqrt(delta[:, 0] * delta[:, 0] + delta[:, 1] * delta[:, 1])
+        steps = self.game.time - self.fire_tick[:n] + alpha
+        travel = np.divide(self.speed[:n] * steps, dist, out=np.zeros(n), where=dist > 0)
+        return origin + delta * travel[:, None]
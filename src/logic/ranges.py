@@ -0,0 +1,73 @@
+from typing import Optional
+
+import numpy as np
+
+
+def pairs_within(pos: np.ndarray, radius: float,
+                 sources: Optional[np.ndarray] = None) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    # (source, spot) pairs closer than radius and their squared distances, sources default to all spots.
+    # Spots are bucketed into cells of size radius, so only 3x3 cells are checked.
+    if sources is None:
+        sources = np.arange(len(pos))
+    if len(pos) == 0 or len(sources) == 0:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64), np.zeros(0)
+
+    cells = np.floor(pos / radius).astype(np.int64)
+    cells -= cells.min(axis=0)
+    # one empty column of cells on each side, so neighbour keys never wrap
+    width = int(cells[:, 1].max()) + 3
+    keys = (cells[:, 0] + 1) * width + (cells[:, 1] + 1)
+    order = np.argsort(keys, kind='stable')
+    sorted_keys = keys[order]
+
+    src_parts, dst_parts = [], []
+    for dx in (-1, 0, 1):
+        for dy in (-1, 0, 1):
+            other = keys[sources] + dx * width + dy
+            start = np.searchsorted(sorted_keys, other, 'left')
+            counts = np.searchsorted(sorted_keys, other, 'right') - start
+            total = int(counts.sum())
+            if total == 0:
+                continue
+            src_parts.append(np.repeat(sources, counts))
+            offsets = np.arange(total) - np.repeat(np.cumsum(counts) - counts, counts)
+            dst_parts.append(order[np.repeat(start, counts) + offsets])
+    src = np.concatenate(src_parts)
+    dst = np.concatenate(dst_parts)
+
+    delta = pos[dst] - pos[src]
+    dist_sq = delta[:, 0] * delta[:, 0] + delta[:, 1] * delta[:, 1]
+    close = dist_sq < radius * radius
+    return src[close], dst[close], dist_sq[close]
+
+
+def compute_ranges(pos: np.ndarray, radius: float) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    # For every spot: the spots closer than radius and squared distances, nearest first, in CSR form
+    n = len(pos)
+    if n == 0:
+        return np.zeros(1, dtype=np.int64), np.zeros(0, dtype=np.int32), np.zeros(0)
+
+    src, dst, dist_sq = pairs_within(pos, radius)
+    o = np.lexsort((dst, dist_sq, src))
+    ptr = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(np.bincount(src, minlength=n), out=ptr[1:])
+    return ptr, dst[o].astype(np.int32), dist_sq[o]
+
+
+class RangeTable:
+    # CSR range table, rows become {spot: squared distance} dicts when first asked for
+    def __init__(self, spots: list, ptr: np.ndarray, idx: np.ndarray, dist_sq: np.ndarray):
+        self.spots = spots
+        self.ptr = ptr
+        self.idx = idx
+        self.dist_sq = dist_sq
+        self.rows: dict[int, dict] = {}
+
+    def __getitem__(self, i: int) -> dict:
+        row = self.rows.get(i)
+        if row is None:
+            a, b = int(self.ptr[i]), int(self.ptr[i + 1])
+            spots = self.spots
+            row = {spots[j]: d for j, d in zip(self.idx[a:b].tolist(), self.dist_sq[a:b].tolist())}
+            self.rows[i] = row
+        return row
@@ -0,0 +1,31 @@
+import heapq
+import itertools
+from typing import Callable
+
+
+class Scheduler:
+    # Callbacks keyed by tick, run in (tick, phase, order of scheduling).
+    # Nothing is ever cancelled: a callback checks that its event is still current.
+    START = 0  # before the towers update
+    PROJECTILES = 1  # hits of scheduled projectiles
+    END = 2  # after the projectiles
+
+    def __init__(self):
+        self.heap: list[tuple] = []
+        self.counter = itertools.count()
+
+    def __len__(self):
+        return len(self.heap)
+
+    def schedule(self, tick: int, callback: Callable, *args, phase: int = START):
+        heapq.heappush(self.heap, (tick, phase, next(self.counter), callback, args))
+
+    def run(self, tick: int, phase: int):
+        # everything due up to this phase of the tick
+        heap = self.heap
+        while heap and (heap[0][0] < tick or heap[0][0] == tick and heap[0][1] <= phase):
+            _, _, _, callback, args = heapq.heappop(heap)
+            callback(*args)
+
+    def clear(self):
+        self.heap.clear()
@@ -0,0 +1,95 @@
+import numpy as np
+
+
+class Snapshot:
+    # All mutable state of a Game as flat tuples and arrays, no references into the object graph
+    # except tower classes.
+    __slots__ = ('time', 'time_to_income', 'winner', 'last_tower_uid',
+                 'towers', 'bans', 'players', 'projectiles')
+
+    def __init__(self, time, time_to_income, winner, last_tower_uid, towers, bans, players, projectiles):
+        self.time: int = time
+        self.time_to_income: int = time_to_income
+        self.winner: int = winner
+        self.last_tower_uid: int = last_tower_uid
+        # (spot index, tower type, player id, uid, hp, attack cd, target uid)
+        self.towers: tuple = towers
+        # (spot index, ban time, banned player id)
+        self.bans: tuple = bans
+        # (money, building cds) per player
+        self.players: tuple = players
+        # (count, columns)
+        self.projectiles: tuple[int, list[np.ndarray]] = projectiles
+
+
+def take_snapshot(game) -> Snapshot:
+    towers = tuple(
+        (
+            t.spot.index, type(t), t.player.id, t.uid, t.hp, t.attack_cd,
+            t.target.uid if t.target is not None else 0,
+        )
+        for t in sorted(game.towers.values(), key=lambda t: t.spot.index)
+    )
+    bans = tuple(
+        (s.index, s.ban_time, s.banned_player.id)
+        for s in game.spots if s.ban_until > game.time and s.banned_player is not None
+    )
+    players = tuple((p.money, tuple(p.building_cds.items())) for p in game.players)
+    store = game.projectiles
+    projectiles = (store.count, [col[:store.count].copy() for col in store.columns()])
+    return Snapshot(
+        game.time, game.time_to_income, game.winner.id if game.winner is not None else 0,
+        game.last_tower_uid, towers, bans, players, projectiles,
+    )
+
+
+def restore_snapshot(game, snap: Snapshot):
+    # a snapshot of the other projectile mode has other columns
+    columns = game.projectiles.columns()
+    saved = snap.projectiles[1]
+    if len(saved) != len(columns) or any(
+            s.dtype != c.dtype or s.shape[1:] != c.shape[1:] for s, c in zip(saved, columns)):
+        raise ValueError(f"Snapshot projectiles do not fit a {type(game.projectiles).__name__}")
+
+    game.time = snap.time
+    game.time_to_income = snap.time_to_income
+    game.winner = game.players[snap.winner - 1] if snap.winner else None
+
+    players = game.players
+    for player, (money, building_cds) in zip(players, snap.players):
+        player.money = money
+        player.building_cds.clear()
+        player.building_cds.update(building_cds)
+
+    spots = game.spots
+    for s in spots:
+        s.tower = None
+        s.ban_until = 0
+        s.banned_player = None
+    for i, ban_time, pid in snap.bans:
+        spots[i].ban_time = ban_time
+        spots[i].banned_player = players[pid - 1]
+
+    # towers that are still the same keep their objects, so outside references stay valid
+    old_towers = game.towers
+    towers = {}
+    for i, tower_type, pid, uid, hp, attack_cd, _ in snap.towers:
+        tower = old_towers.get(uid)
+        if tower is None or type(tower) is not tower_type or tower.spot is not spots[i]:
+            tower = tower_type(game, spots[i], players[pid - 1])
+            tower.uid = uid
+        tower.hp = hp
+        tower.attack_cd = attack_cd
+        spots[i].tower = tower
+        towers[uid] = tower
+    for _, _, _, uid, _, _, target_uid in snap.towers:
+        towers[uid].target = towers.get(target_uid)
+    game.towers = towers
+    game.last_tower_uid = snap.last_tower_uid
+
+    count, columns = snap.projectiles
+    store = game.projectiles
+    store.reserve(count)
+    for col, saved in zip(store.columns(), columns):
+        col[:count] = saved
+    store.count = count
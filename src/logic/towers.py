@@ -4,9 +4,16 @@ from logic.game import Tower, Spot
 from logic import consts
 
 
-# TODO: lose if die
 # TODO: provide electricity
 class BaseTower(Tower):
+    __slots__ = ()
+
+    # player loses if the base dies
+    def die(self):
+        super().die()
+        if self.game.winner is None:
+            self.game.winner = self.game.opponent(self.player)
+
     MAX_HP = 12000
     COST = 700
     ATTACK_CD = 20
@@ -20,6 +27,8 @@ class BaseTower(Tower):
 
 
 class MiningTower(Tower):
+    __slots__ = ()
+
     # no orders
     def ask_order(self, act: int, target: Optional[Spot] = None, check_only=False):
         if check_only:
@@ -43,15 +52,12 @@ class MiningTower(Tower):
     def shoot(self, target: Tower):
         raise NotImplementedError
 
-    # gives money
-    def income_frame(self):
-        self.player.money += self.INCOME
-
     MAX_HP = 6000
     COST = 300
     BUILDING_TIME = 0
     BUILDING_CD = 1800
 
+    # gives money
     INCOME = 5
 
     ATTACK_CD = None
@@ -64,6 +70,8 @@ class MiningTower(Tower):
 
 
 class LongRangeTower(Tower):
+    __slots__ = ()
+
     MAX_HP = 6000
     COST = 200
     ATTACK_CD = 20
@@ -77,6 +85,8 @@ class LongRangeTower(Tower):
 
 
 class ShortRangeTower(Tower):
+    __slots__ = ()
+
     MAX_HP = 8000
     COST = 300
     ATTACK_CD = 40
@@ -87,3 +97,8 @@ class ShortRangeTower(Tower):
     BUILDING_CD = 300
 
     NAME = 'Short range'
+
+
+TOWER_TYPES = {
+    t.__name__: t for t in [BaseTower, MiningTower, LongRangeTower, ShortRangeTower]
+}
@@ -1,15 +1,40 @@
+import argparse
+
 import pygame as pg
 
 from basics.load import load_from_file
 from logic.towers import BaseTower, LongRangeTower, MiningTower, ShortRangeTower
 from basics.session import Session
+from interface.ai import AIController
+from logic import consts
 
 
 if __name__ == "__main__":
-    game = load_from_file("levels/grid.lvl")
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--level", default="levels/grid.lvl")
+    parser.add_argument("--record", help="save a replay of the match to this file")
+    parser.add_argument("--tick-rate", type=int, default=consts.TICK_RATE, help="simulation ticks per second")
+    parser.add_argument("--fps", type=int, default=consts.FPS, help="frame rate limit, 0 for none")
+    parser.add_argument("--profile", help="write per-tick timings to this CSV file, F3 shows them")
+    parser.add_argument("--bot", type=int, choices=[1, 2], help="the computer plays for this player")
+    parser.add_argument("--bot-budget", type=float, default=4.0, help="milliseconds the bot thinks per tick")
+    parser.add_argument("--bot-workers", type=int, default=0, help="processes for the bot rollouts, 0 for none")
+    parser.add_argument("--threaded", action="store_true", help="run the simulation on its own thread")
+    args = parser.parse_args()
+
+    consts.FPS = args.fps
+    game = load_from_file(args.level, args.tick_rate)
     session = Session(game)
     session.set_tower_types([MiningTower, LongRangeTower, ShortRangeTower])
     session.game.player_one.money += 100
     session.game.player_two.money += 100
+    if args.bot is not None:
+        player = session.game.players[args.bot - 1]
+        bot = AIController(session.game, player, budget=args.bot_budget / 1000, workers=args.bot_workers)
+        session.set_controller(args.bot - 1, bot)
+    if args.record is not None:
+        session.start_recording(args.level, args.record)
+    if args.profile is not None:
+        session.enable_profiling(args.profile)
 
-    session.loop()
+    session.loop(args.threaded)
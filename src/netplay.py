@@ -0,0 +1,41 @@
+import argparse
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from basics.netplay import play, run_relay, run_headless_peer
+from logic import consts
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Two player match over the network in lockstep")
+    parser.add_argument("mode", choices=["relay", "play", "selftest"])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=5555)
+    parser.add_argument("--level", default="levels/grid.lvl")
+    parser.add_argument("--tick-rate", type=int, default=consts.TICK_RATE)
+    parser.add_argument("--delay", type=int, default=3, help="input delay in ticks")
+    parser.add_argument("--ticks", type=int, default=3600, help="selftest match length")
+    args = parser.parse_args()
+
+    if args.mode == "relay":
+        run_relay(args.port, args.host)
+    elif args.mode == "play":
+        play(args.host, args.port, args.level, args.tick_rate, args.delay)
+    else:
+        # relay and two random players on loopback, each player in its own process
+        ready = threading.Event()
+        threading.Thread(target=run_relay, args=(args.port, args.host, ready), daemon=True).start()
+        ready.wait()
+        start = time.perf_counter()
+        with ProcessPoolExecutor(2) as pool:
+            peers = [
+                pool.submit(run_headless_peer, args.host, args.port, args.level,
+                            args.tick_rate, args.delay, args.ticks, 7)
+                for _ in range(2)
+            ]
+            results = [p.result() for p in peers]
+        elapsed = time.perf_counter() - start
+        for pid, checksum, per_tick in sorted(results):
+            print(f"player {pid}: checksum {checksum:08x}, {per_tick:.1f} bytes/tick sent")
+        print(f"{args.ticks} ticks in {elapsed:.2f}s, {'in sync' if results[0][1] == results[1][1] else 'DESYNC'}")
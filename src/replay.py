@@ -0,0 +1,48 @@
+import argparse
+import os
+import shlex
+
+from basics.replay import load_replay
+
+
+def make_writer(args, tick_rate: int):
+    from basics.capture import PipeWriter, PngWriter, encoder_command, frame_size
+
+    size = frame_size(args.scale)
+    fps = tick_rate / args.stride
+    if args.encoder is not None:
+        command = [part.format(width=size[0], height=size[1], fps=f'{fps:g}', out=args.capture)
+                   for part in shlex.split(args.encoder)]
+        return PipeWriter(command, size)
+    if os.path.splitext(args.capture)[1]:
+        return PipeWriter(encoder_command(args.capture, size, fps), size)
+    return PngWriter(args.capture, size, args.workers)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Replay a recorded match")
+    parser.add_argument("replay")
+    parser.add_argument("--render", action="store_true", help="show the match at normal speed")
+    parser.add_argument("--scheduled-projectiles", action="store_true", help="schedule hits instead of stepping")
+    parser.add_argument("--capture", help="draw the match without a window into a directory of PNG frames, "
+                                          "or a video file encoded by ffmpeg")
+    parser.add_argument("--stride", type=int, default=1, help="capture every n-th tick")
+    parser.add_argument("--scale", type=float, default=1.0, help="resolution of the frames relative to the screen")
+    parser.add_argument("--start", type=int, default=0, help="first tick to capture")
+    parser.add_argument("--workers", type=int, default=0, help="processes encoding PNG frames, 0 for a thread")
+    parser.add_argument("--encoder", help="command reading raw rgb24 frames from stdin, "
+                                          "{width} {height} {fps} {out} are filled in")
+    args = parser.parse_args()
+
+    replay = load_replay(args.replay)
+    if args.capture is not None:
+        os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+        writer = make_writer(args, replay.tick_rate)
+        game, frames, fps = replay.run_captured(writer, args.stride, args.start, args.scheduled_projectiles)
+        print(f"{frames} frames, {fps:.1f} frames/sec, writer stalled {writer.stalls} times")
+    elif args.render:
+        replay.run_rendered(args.scheduled_projectiles)
+    else:
+        game, tps = replay.run_headless(args.scheduled_projectiles)
+        print(f"{replay.ticks} ticks, {tps:.0f} ticks/sec")
+        print(f"money: {game.player_one.money} / {game.player_two.money}")
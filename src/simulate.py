@@ -0,0 +1,45 @@
+import argparse
+
+from basics.load import load_from_file
+from basics.headless import HeadlessSession
+from interface.control import ScriptedController, RandomController, load_script
+from logic.profiling import Profiler
+from logic.towers import LongRangeTower, MiningTower, ShortRangeTower
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run a match without a display as fast as possible")
+    parser.add_argument("level", nargs="?", default="levels/grid.lvl")
+    parser.add_argument("--ticks", type=int, default=60 * 60 * 5)
+    parser.add_argument("--script", help="input script, lines '<tick> <player> <actions>'")
+    parser.add_argument("--profile", help="write per-tick timings to this CSV file")
+    parser.add_argument("--seed", type=int, default=0, help="seed for random players if no script")
+    parser.add_argument("--scheduled-projectiles", action="store_true", help="schedule hits instead of stepping")
+    args = parser.parse_args()
+
+    game = load_from_file(args.level, scheduled_projectiles=args.scheduled_projectiles)
+    if args.script is not None:
+        scripts = load_script(args.script)
+        controllers = (
+            ScriptedController(game, game.player_one, scripts[1]),
+            ScriptedController(game, game.player_two, scripts[2]),
+        )
+    else:
+        controllers = (
+            RandomController(game, game.player_one, seed=args.seed),
+            RandomController(game, game.player_two, seed=args.seed + 1),
+        )
+    session = HeadlessSession(game, controllers)
+    session.set_tower_types([MiningTower, LongRangeTower, ShortRangeTower])
+    game.player_one.money += 100
+    game.player_two.money += 100
+
+    if args.profile is not None:
+        game.profiler = Profiler(args.profile)
+    tps = session.run(args.ticks)
+    if game.profiler is not None:
+        game.profiler.close()
+    print(f"{args.ticks} ticks, {tps:.0f} ticks/sec")
+    print(f"money: {game.player_one.money} / {game.player_two.money}")
+    print(f"towers: {sum(s.tower is not None and s.tower.player.id == 1 for s in game.spots)}"
+          f" / {sum(s.tower is not None and s.tower.player.id == 2 for s in game.spots)}")
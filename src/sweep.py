@@ -0,0 +1,24 @@
+import argparse
+import time
+
+from basics.sweep import parse_grid, sweep, write_results, write_economy
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Play scripted matches over a grid of balance parameters")
+    parser.add_argument("--param", action="append", default=[],
+                        help="NAME=v1,v2,... where NAME is a logic.consts value or Tower.ATTR, e.g. LongRangeTower.COST")
+    parser.add_argument("--levels", nargs="+", default=["levels/grid.lvl", "levels/asym.lvl"])
+    parser.add_argument("--matches", type=int, default=8, help="matches per combination and level")
+    parser.add_argument("--ticks", type=int, default=60 * 60 * 10, help="match length limit")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--out", default="sweep.csv")
+    parser.add_argument("--economy-out", default="sweep_economy.csv")
+    args = parser.parse_args()
+
+    grid = parse_grid(args.param)
+    start = time.perf_counter()
+    results = sweep(grid, args.levels, args.matches, args.ticks, args.workers)
+    write_results(grid, results, args.out)
+    write_economy(grid, results, args.economy_out)
+    print(f"{sum(map(len, results.values()))} matches in {time.perf_counter() - start:.1f}s, results in {args.out}")
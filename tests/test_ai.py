@@ -0,0 +1,72 @@
+import os
+import time
+
+from basics.bench import populate
+from basics.load import load_from_file
+from interface.ai import AIController, LocalSearch, PoolSearch
+from interface.control import COMMAND_CODES
+from logic.towers import LongRangeTower, MiningTower, ShortRangeTower
+
+LEVEL = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'levels', 'grid.lvl')
+
+
+def make_game():
+    game = load_from_file(LEVEL)
+    for player in game.players:
+        player.set_tower_types([MiningTower, LongRangeTower, ShortRangeTower])
+        player.money += 1000
+    return game
+
+
+def test_every_candidate_is_a_command():
+    game = make_game()
+    # enemy towers next to own ones, so that there are focus orders to give
+    one, two = game.player_one, game.player_two
+    for spot in game.spots[:len(game.spots) // 2]:
+        if spot.tower is None:
+            spot.create_tower(LongRangeTower, one if spot.index % 2 else two)
+    for player in game.players:
+        ai = AIController(game, player)
+        candidates = ai.candidates()
+        assert any(action[0] == 'focus' for action in candidates)
+        for action in candidates:
+            for command in ai.action_commands(action):
+                assert tuple(command) in COMMAND_CODES
+
+
+def test_match_commands_are_commands():
+    game = make_game()
+    controllers = (
+        AIController(game, game.player_one, budget=1.0, decision_interval=10),
+        AIController(game, game.player_two, budget=1.0, decision_interval=10),
+    )
+    given = 0
+    for _ in range(600):
+        for cnt in controllers:
+            commands = cnt.commands([])
+            for command in commands:
+                assert tuple(command) in COMMAND_CODES
+            given += len(commands)
+            cnt.apply(commands)
+        game.update()
+        if game.winner is not None:
+            break
+    assert given > 0
+
+
+def test_pool_rollouts_score_like_local_ones():
+    game = load_from_file(LEVEL, scheduled_projectiles=True)
+    populate(game, 0.6)
+    for _ in range(120):
+        game.update()
+    assert len(game.projectiles) > 0
+    ai = AIController(game, game.player_one, workers=1)
+    candidates = ai.candidates()
+    root = game.snapshot()
+    local = LocalSearch(ai.sim, root, 1, candidates, ai.horizon)
+    assert local.advance(float('inf'))
+    pool = PoolSearch(ai.pool, root, 1, candidates, ai.horizon)
+    while not pool.advance(float('inf')):
+        time.sleep(0.01)
+    ai.pool.shutdown()
+    assert pool.scores == local.scores
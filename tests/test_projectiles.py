@@ -0,0 +1,53 @@
+import os
+
+import pytest
+
+from basics.headless import HeadlessSession
+from basics.load import load_from_file
+from basics.replay import Recorder
+from check_projectiles import first_difference, replay_sessions
+from interface.control import RandomController
+from logic.towers import LongRangeTower, MiningTower, ShortRangeTower
+
+LEVEL = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'levels', 'grid.lvl')
+TICKS = 10000
+
+
+def record_match(filename: str, tick_rate: int, seed: int) -> int:
+    # seeded random match, returns the most projectiles in flight at once
+    game = load_from_file(LEVEL, tick_rate)
+    for player in game.players:
+        player.set_tower_types([MiningTower, LongRangeTower, ShortRangeTower])
+        player.money += 1000
+    controllers = (
+        RandomController(game, game.player_one, seed=seed, press_chance=0.3),
+        RandomController(game, game.player_two, seed=seed + 1, press_chance=0.3),
+    )
+    recorder = Recorder(game, LEVEL, filename)
+    recorder.attach(controllers)
+    session = HeadlessSession(game, controllers)
+    in_flight = 0
+    for _ in range(TICKS):
+        session.frame()
+        in_flight = max(in_flight, len(game.projectiles))
+    recorder.save()
+    return in_flight
+
+
+@pytest.mark.parametrize('tick_rate', [60, 45])
+def test_scheduled_projectiles_match_stepped(tmp_path, tick_rate):
+    filename = str(tmp_path / 'match.rep')
+    assert record_match(filename, tick_rate, seed=0) > 0
+    sessions, ticks = replay_sessions(filename)
+    assert sessions[0].game.tick_rate == tick_rate
+    # tower hp, money and the winner every tick
+    assert first_difference(sessions, ticks) is None
+
+
+def test_restore_rejects_other_projectile_mode():
+    stepped = load_from_file(LEVEL)
+    scheduled = load_from_file(LEVEL, scheduled_projectiles=True)
+    with pytest.raises(ValueError, match='do not fit'):
+        stepped.restore(scheduled.snapshot())
+    with pytest.raises(ValueError, match='do not fit'):
+        scheduled.restore(stepped.snapshot())